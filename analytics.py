@@ -0,0 +1,232 @@
+"""Organisation-wide tax analytics over batch results (needs numpy)
+
+    python analytics.py results.taxcol [--by age_band|income_band|regime]
+
+Aggregator consumes result columns (as produced by columnar.compute_columns
+or read from a ResultStore) one chunk at a time and keeps only per-group
+running sums, so a single pass covers any number of employees. Partial
+aggregates from shards or worker processes combine with merge(), or travel
+as plain JSON through state() / from_state().
+
+Per group it reports the head count, the share better off in each regime,
+total potential savings, the distribution of the effective tax rate (tax
+under the better regime over gross income) and, per deduction section, how
+many employees claim it and how much of its limit they use, measured
+against each claimant's own cap (senior and income-based limits included).
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from rules import get_rules
+
+AGE_BANDS = (0, 30, 40, 50, 60, 80)
+INCOME_BANDS = (0, 500000, 1000000, 1500000, 2500000, 5000000, 10000000)
+# Effective tax rate histogram: 0.5% bins up to 45%, everything above in the last
+RATE_EDGES = tuple(np.round(np.arange(0, 0.4501, 0.005), 3))
+GROUPINGS = ('age_band', 'income_band', 'regime', None)
+
+
+def _amount_label(value):
+    if value >= 10000000:
+        return f'{value / 10000000:g}Cr'
+    return f'{value / 100000:g}L'
+
+
+def _band_labels(edges, label):
+    labels = [f'{label(low)}-{label(high)}' for low, high in zip(edges, edges[1:])]
+    return tuple(labels) + (f'{label(edges[-1])}+',)
+
+
+def group_labels(by):
+    if by == 'age_band':
+        return _band_labels(AGE_BANDS, str)
+    if by == 'income_band':
+        return _band_labels(INCOME_BANDS, _amount_label)
+    if by == 'regime':
+        return ('new', 'old')
+    return ('all',)
+
+
+class Aggregator:
+    """Mergeable group-by aggregate of comparison results"""
+
+    def __init__(self, by=None, codes=None, year=None):
+        if by not in GROUPINGS:
+            raise ValueError(f"by must be one of {', '.join(map(str, GROUPINGS))}")
+        catalogue = get_rules(year, 'old').deductions
+        self.by = by
+        self.year = year
+        self.codes = tuple(code for code in (codes or catalogue) if code != 'standard')
+        self.labels = group_labels(by)
+        groups, n_codes = len(self.labels), len(self.codes)
+        self.employees = np.zeros(groups, dtype=np.int64)
+        self.old_better = np.zeros(groups, dtype=np.int64)
+        self.savings = np.zeros(groups)
+        self.income = np.zeros(groups)
+        self.tax = np.zeros(groups)
+        self.rate_histogram = np.zeros((groups, len(RATE_EDGES)), dtype=np.int64)
+        self.claimants = np.zeros((groups, n_codes), dtype=np.int64)
+        self.applied = np.zeros((groups, n_codes))
+        self.capacity = np.zeros((groups, n_codes))
+
+    def _groups(self, columns):
+        n = len(columns['income'])
+        if self.by == 'age_band':
+            return np.searchsorted(AGE_BANDS, columns['age'], side='right') - 1
+        if self.by == 'income_band':
+            return np.searchsorted(INCOME_BANDS, columns['income'], side='right') - 1
+        if self.by == 'regime':
+            return np.asarray(columns['better_regime'], dtype=np.intp)
+        return np.zeros(n, dtype=np.intp)
+
+    def update(self, columns):
+        """Fold in one chunk of result columns ({name: array})"""
+        groups = np.maximum(self._groups(columns), 0)
+        size = len(self.labels)
+        income = np.asarray(columns['income'], dtype=np.float64)
+        best_tax = np.minimum(columns['old_tax'], columns['new_tax'])
+        rate = np.divide(best_tax, income, out=np.zeros_like(income), where=income > 0)
+        bins = np.minimum(np.searchsorted(RATE_EDGES, rate, side='right') - 1, len(RATE_EDGES) - 1)
+
+        self.employees += np.bincount(groups, minlength=size)
+        self.old_better += np.bincount(groups, weights=columns['better_regime'], minlength=size).astype(np.int64)
+        self.savings += np.bincount(groups, weights=columns['savings'], minlength=size)
+        self.income += np.bincount(groups, weights=income, minlength=size)
+        self.tax += np.bincount(groups, weights=best_tax, minlength=size)
+        self.rate_histogram += np.bincount(groups * len(RATE_EDGES) + bins,
+                                           minlength=size * len(RATE_EDGES)).reshape(size, -1)
+        calculator = None
+        for j, code in enumerate(self.codes):
+            applied = columns.get(code)
+            if applied is None:
+                continue
+            claimed = applied > 0
+            if not claimed.any():
+                continue
+            if calculator is None:
+                from batch import deduction_cap
+                from calculator import IndianTaxCalculator
+                calculator = IndianTaxCalculator()
+            cap = deduction_cap(calculator, code, income, columns['age'], self.year)
+            self.claimants[:, j] += np.bincount(groups, weights=claimed, minlength=size).astype(np.int64)
+            self.applied[:, j] += np.bincount(groups, weights=applied, minlength=size)
+            self.capacity[:, j] += np.bincount(groups, weights=np.where(claimed, cap, 0.0), minlength=size)
+        return self
+
+    def _check_compatible(self, other):
+        if (self.by, self.codes, self.year) != (other.by, other.codes, other.year):
+            raise ValueError("can only merge aggregates with the same grouping, codes and year")
+
+    def merge(self, other):
+        """Add another partial aggregate into this one"""
+        self._check_compatible(other)
+        for name in ('employees', 'old_better', 'savings', 'income', 'tax',
+                     'rate_histogram', 'claimants', 'applied', 'capacity'):
+            getattr(self, name).__iadd__(getattr(other, name))
+        return self
+
+    def state(self):
+        """JSON-serialisable partial aggregate"""
+        return {
+            'by': self.by, 'year': self.year, 'codes': list(self.codes),
+            'employees': self.employees.tolist(), 'old_better': self.old_better.tolist(),
+            'savings': self.savings.tolist(), 'income': self.income.tolist(), 'tax': self.tax.tolist(),
+            'rate_histogram': self.rate_histogram.tolist(),
+            'claimants': self.claimants.tolist(), 'applied': self.applied.tolist(),
+            'capacity': self.capacity.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        aggregate = cls(state['by'], state['codes'], state['year'])
+        for name in ('employees', 'old_better', 'savings', 'income', 'tax',
+                     'rate_histogram', 'claimants', 'applied', 'capacity'):
+            current = getattr(aggregate, name)
+            setattr(aggregate, name, np.asarray(state[name], dtype=current.dtype).reshape(current.shape))
+        return aggregate
+
+    def _rate_percentile(self, histogram, pct):
+        total = histogram.sum()
+        if not total:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(histogram), pct / 100 * total))
+        upper = RATE_EDGES[index + 1] if index + 1 < len(RATE_EDGES) else RATE_EDGES[-1]
+        return float(upper)
+
+    def result(self):
+        """{group label: statistics} for every group with at least one employee"""
+        report = {}
+        for g, label in enumerate(self.labels):
+            employees = int(self.employees[g])
+            if not employees:
+                continue
+            deductions = {}
+            for j, code in enumerate(self.codes):
+                claimants = int(self.claimants[g, j])
+                if not claimants:
+                    continue
+                deductions[code] = {
+                    'claimants': claimants,
+                    'applied': float(self.applied[g, j]),
+                    # Share of the claimants' combined caps used; None for uncapped sections
+                    'utilization': (float(self.applied[g, j] / self.capacity[g, j])
+                                    if np.isfinite(self.capacity[g, j]) else None),
+                }
+            histogram = self.rate_histogram[g]
+            report[label] = {
+                'employees': employees,
+                'share_old_better': int(self.old_better[g]) / employees,
+                'share_new_better': 1 - int(self.old_better[g]) / employees,
+                'total_savings': float(self.savings[g]),
+                'mean_effective_rate': float(self.tax[g] / self.income[g]) if self.income[g] else 0.0,
+                'effective_rate_percentiles': {f'p{p}': self._rate_percentile(histogram, p) for p in (10, 50, 90)},
+                'deductions': deductions,
+            }
+        return report
+
+
+def aggregate_store(store, by=None, chunk_size=1_000_000):
+    """Aggregator over every row of a columnar.ResultStore"""
+    aggregate = Aggregator(by, store.codes, store.year)
+    for chunk in store.iter_chunks(chunk_size):
+        aggregate.update(chunk)
+    return aggregate
+
+
+def aggregate_records(records, by=None, chunk_size=100000, year=None, calculator=None):
+    """Aggregator computed straight from (employee_id, income, age, deductions) records"""
+    from bulk import chunked
+    from columnar import compute_columns
+    from calculator import IndianTaxCalculator
+
+    calculator = calculator or IndianTaxCalculator()
+    aggregate = Aggregator(by, year=year)
+    for chunk in chunked(records, chunk_size):
+        _, incomes, ages, deduction_rows = zip(*chunk)
+        present = set().union(*deduction_rows)
+        deductions = {code: [row.get(code, 0) for row in deduction_rows] for code in present}
+        aggregate.update(compute_columns(calculator, incomes, ages, deductions, aggregate.codes, year))
+    return aggregate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summary statistics over a .taxcol result file")
+    parser.add_argument('store', nargs='+', help=".taxcol files; several are treated as shards and merged")
+    parser.add_argument('--by', choices=[g for g in GROUPINGS if g])
+    args = parser.parse_args(argv)
+
+    from columnar import ResultStore
+
+    total = None
+    for path in args.store:
+        partial = aggregate_store(ResultStore.open(path), args.by)
+        total = partial if total is None else total.merge(partial)
+    json.dump(total.result(), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
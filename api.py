@@ -0,0 +1,57 @@
+"""Validation and evaluation of structured JSON inputs, shared by the WSGI and ASGI apps"""
+import math
+
+from query_parser import DEDUCTION_CODES
+
+REGIMES = ('compare', 'old', 'new')
+
+
+def _number(value, field):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"'{field}' must be a non-negative number")
+    return value
+
+
+def structured_item(chatbot, item):
+    """Validate one JSON input and return its structured result
+
+    An item is either {"query": "..."} or {"income": ..., "age": ...,
+    "deductions": {code: amount}, "regime": ..., "year": ...}. Raises
+    ValueError with a client-facing message on bad input.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("each item must be a JSON object")
+    if 'query' in item:
+        if not isinstance(item['query'], str):
+            raise ValueError("'query' must be a string")
+        answer = chatbot.answer(item['query'], render=False)
+        if answer.kind == 'deductions':
+            raise ValueError("query does not describe a tax calculation")
+        if answer.kind == 'missing_income':
+            raise ValueError("no income amount found in query")
+        return {'income': answer.income, 'age': answer.age, 'regime': answer.regime,
+                'year': None, 'claimed': answer.deductions, 'result': answer.result}
+
+    if 'income' not in item:
+        raise ValueError("either 'query' or 'income' is required")
+    income = _number(item['income'], 'income')
+    age = item.get('age', 30)
+    if isinstance(age, bool) or not isinstance(age, int) or age < 0:
+        raise ValueError("'age' must be a non-negative integer")
+    regime = item.get('regime') or 'compare'
+    if regime not in REGIMES:
+        raise ValueError(f"'regime' must be one of {', '.join(REGIMES)}")
+    claimed = item.get('deductions') or {}
+    if not isinstance(claimed, dict):
+        raise ValueError("'deductions' must be an object of code: amount")
+    unknown = set(claimed).difference(DEDUCTION_CODES)
+    if unknown:
+        raise ValueError(f"unknown deduction codes: {', '.join(sorted(unknown))}")
+    # Catalogue order, the order parsed queries apply deductions in
+    claimed = {code: _number(claimed[code], code) for code in DEDUCTION_CODES if code in claimed}
+    year = item.get('year')
+    if year is not None and not isinstance(year, str):
+        raise ValueError("'year' must be a financial year string such as '2024-25'")
+    result = chatbot.calculate(regime, income, age, claimed, year)
+    return {'income': income, 'age': age, 'regime': regime, 'year': year,
+            'claimed': claimed, 'result': result}
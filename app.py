@@ -1,18 +1,99 @@
-from flask import Flask, render_template, request, jsonify
-from t1 import IndianTaxCalculator, TaxChatbot  # Import your existing classes
+import json
+import secrets
 
-app = Flask(__name__)
-chatbot = TaxChatbot()
+from flask import Flask, Response, render_template, request, jsonify
 
-@app.route('/')
-def home():
-    return render_template('index.html')
+SESSION_COOKIE = 'tax_session'
 
-@app.route('/calculate', methods=['POST'])
-def calculate():
-    query = request.form.get('query', '')
-    response = chatbot.process_query(query)
-    return jsonify({'response': response})
+def create_app(chatbot=None):
+    """Build the Flask app; nothing is constructed until this is called
+
+    The chatbot (and with it the parser and rule tables) is only imported
+    here, so importing this module stays cheap for tools that never serve.
+    """
+    from api import structured_item
+    from metrics import profiler_from_env
+    from render import parse_sections
+    from t1 import TaxChatbot
+
+    app = Flask(__name__)
+    if chatbot is None:
+        chatbot = TaxChatbot(profiler=profiler_from_env())
+    app.config['CHATBOT'] = chatbot
+
+    @app.route('/')
+    def home():
+        return render_template('index.html')
+
+    @app.route('/calculate', methods=['POST'])
+    def calculate():
+        # Follow-up questions build on earlier ones from the same browser
+        session_id = request.cookies.get(SESSION_COOKIE) or secrets.token_urlsafe(16)
+        # Optional format ('text', 'markdown', 'html') and comma-separated
+        # sections, checked before the turn can change the session
+        fmt = request.form.get('format', 'text')
+        sections = parse_sections(request.form.get('sections'))
+        try:
+            chatbot.renderer.check(fmt, sections)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        answer = chatbot.session_answer(session_id, request.form.get('query', ''))
+        if fmt == 'text' and sections is None:
+            text = answer.response
+        else:
+            text = chatbot.render(answer, fmt, sections)
+        response = jsonify({'response': text})
+        if request.cookies.get(SESSION_COOKIE) != session_id:
+            response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite='Lax')
+        return response
+
+    @app.route('/api/calculate', methods=['POST'])
+    def api_calculate():
+        """Structured result for one JSON input instead of rendered text"""
+        item = request.get_json(silent=True)
+        try:
+            return jsonify(structured_item(chatbot, item))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    @app.route('/api/batch', methods=['POST'])
+    def api_batch():
+        """Structured results for a JSON array of inputs, streamed back as NDJSON
+
+        One line per input, in input order, each carrying its index. A bad item
+        yields an {"index", "error"} line and the rest of the batch still runs.
+        """
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            return jsonify({'error': "request body must be a JSON array"}), 400
+
+        def generate():
+            for index, item in enumerate(items):
+                try:
+                    line = {'index': index, **structured_item(chatbot, item)}
+                except ValueError as e:
+                    line = {'index': index, 'error': str(e)}
+                yield json.dumps(line) + '\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    @app.route('/cache/stats')
+    def cache_stats():
+        return jsonify(chatbot.cache_stats())
+
+    @app.route('/sessions/stats')
+    def session_stats():
+        return jsonify(chatbot.sessions.stats())
+
+    @app.route('/metrics')
+    def metrics():
+        return jsonify(chatbot.metrics_snapshot())
+
+    @app.route('/metrics/prometheus')
+    def metrics_prometheus():
+        return Response(chatbot.metrics_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
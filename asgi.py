@@ -0,0 +1,212 @@
+"""Asyncio-native ASGI entry point
+
+    pip install uvicorn
+    uvicorn asgi:app --port 8000
+
+Serves the routes of app.py without Flask, including /calculate's format
+and sections, but keeps no follow-up sessions: each /calculate query
+stands alone and there is no /sessions/stats. Parsing and tax work run on
+a thread pool so the event loop only moves bytes, and identical queries
+that arrive while one is already being computed wait for that computation
+instead of starting their own.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from api import structured_item
+from metrics import profiler_from_env
+from render import parse_sections
+from t1 import TaxChatbot
+
+MAX_BODY = 10 * 1024 * 1024
+BATCH_CHUNK = 256
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'index.html'), 'rb') as f:
+    INDEX_HTML = f.read()
+
+
+def normalize_query(query):
+    """Coalescing key for a raw query; the parser ignores case and spacing"""
+    return ' '.join(query.split()).lower()
+
+
+class Coalescer:
+    """Share one computation between concurrent callers asking for the same key
+
+    Only in-flight work is shared; once a result is delivered the key is
+    forgotten, so repeated queries are left to the chatbot's own caches.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key, fn, *args):
+        self.calls += 1
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = self.inflight[key] = loop.run_in_executor(self.executor, fn, *args)
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        # A waiter that goes away must not cancel the work others wait on
+        return await asyncio.shield(future)
+
+    def stats(self):
+        return {'calls': self.calls, 'coalesced': self.coalesced, 'inflight': len(self.inflight)}
+
+
+class TaxApp:
+    """Pure ASGI application around one shared TaxChatbot"""
+
+    def __init__(self, chatbot=None, workers=None):
+        self.chatbot = chatbot or TaxChatbot(profiler=profiler_from_env())
+        workers = workers or int(os.environ.get('TAX_THREADS', 4))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tax')
+        self.coalescer = Coalescer(self.executor)
+        self.routes = {
+            ('GET', '/'): self.home,
+            ('POST', '/calculate'): self.calculate,
+            ('POST', '/api/calculate'): self.api_calculate,
+            ('POST', '/api/batch'): self.api_batch,
+            ('GET', '/cache/stats'): self.cache_stats,
+            ('GET', '/metrics'): self.metrics,
+            ('GET', '/metrics/prometheus'): self.metrics_prometheus,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        handler = self.routes.get((scope['method'], scope['path']))
+        if handler is None:
+            status = 405 if any(path == scope['path'] for _, path in self.routes) else 404
+            await _send_json(send, {'error': 'method not allowed' if status == 405 else 'not found'}, status)
+            return
+        body = b''
+        if scope['method'] == 'POST':
+            body = await _read_body(receive)
+            if body is None:
+                await _send_json(send, {'error': 'request body too large'}, 413)
+                return
+        await handler(body, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def home(self, body, send):
+        await _send(send, 200, INDEX_HTML, b'text/html; charset=utf-8')
+
+    async def calculate(self, body, send):
+        form = parse_qs(body.decode('utf-8', 'replace'))
+        query = form.get('query', [''])[0]
+        fmt = form.get('format', ['text'])[0]
+        sections = parse_sections(form.get('sections', [''])[0])
+        try:
+            self.chatbot.renderer.check(fmt, sections)
+        except ValueError as e:
+            await _send_json(send, {'error': str(e)}, 400)
+            return
+        if fmt == 'text' and sections is None:
+            response = await self.coalescer.run(('text', normalize_query(query)), self.chatbot.process_query, query)
+        else:
+            key = (fmt, tuple(sections or ()), normalize_query(query))
+            response = await self.coalescer.run(key, self._render, query, fmt, sections)
+        await _send_json(send, {'response': response})
+
+    def _render(self, query, fmt, sections):
+        return self.chatbot.render(self.chatbot.answer(query, render=False), fmt, sections)
+
+    async def api_calculate(self, body, send):
+        item = _load_json(body)
+        key = ('json', json.dumps(item, sort_keys=True))
+        try:
+            result = await self.coalescer.run(key, structured_item, self.chatbot, item)
+        except ValueError as e:
+            await _send_json(send, {'error': str(e)}, 400)
+            return
+        await _send_json(send, result)
+
+    async def api_batch(self, body, send):
+        items = _load_json(body)
+        if not isinstance(items, list):
+            await _send_json(send, {'error': "request body must be a JSON array"}, 400)
+            return
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/x-ndjson')]})
+        loop = asyncio.get_running_loop()
+        # One executor hop per chunk keeps the loop free without paying a hop per item
+        for start in range(0, len(items), BATCH_CHUNK):
+            lines = await loop.run_in_executor(self.executor, self._batch_lines,
+                                               items[start:start + BATCH_CHUNK], start)
+            await send({'type': 'http.response.body', 'body': lines, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def _batch_lines(self, items, offset):
+        lines = []
+        for index, item in enumerate(items, offset):
+            try:
+                line = {'index': index, **structured_item(self.chatbot, item)}
+            except ValueError as e:
+                line = {'index': index, 'error': str(e)}
+            lines.append(json.dumps(line) + '\n')
+        return ''.join(lines).encode('utf-8')
+
+    async def cache_stats(self, body, send):
+        await _send_json(send, {**self.chatbot.cache_stats(), 'coalescing': self.coalescer.stats()})
+
+    async def metrics(self, body, send):
+        await _send_json(send, {**self.chatbot.metrics_snapshot(), 'coalescing': self.coalescer.stats()})
+
+    async def metrics_prometheus(self, body, send):
+        await _send(send, 200, self.chatbot.metrics_prometheus().encode('utf-8'), b'text/plain; version=0.0.4')
+
+
+async def _read_body(receive):
+    """Whole request body, or None once it grows past MAX_BODY"""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def _load_json(body):
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+async def _send(send, status, body, content_type):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', content_type),
+                            (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_json(send, payload, status=200):
+    await _send(send, status, json.dumps(payload).encode('utf-8'), b'application/json')
+
+
+app = TaxApp()
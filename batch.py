@@ -0,0 +1,93 @@
+import numpy as np
+
+# Array forms of rules.CAP_FORMULAS
+VECTOR_CALCS = {
+    'nps_employee': lambda x: np.minimum(0.1*x, 150000),
+    'rent_paid': lambda x: np.minimum(np.minimum(5000*12, 0.25*x), x-0.1*x),
+}
+
+
+def _columns(deductions_matrix, codes, n):
+    """Yield (code, column) pairs from a dict of columns or a 2-D array"""
+    if deductions_matrix is None:
+        return []
+    if hasattr(deductions_matrix, 'items'):
+        pairs = deductions_matrix.items()
+    else:
+        matrix = np.asarray(deductions_matrix, dtype=np.float64).reshape(n, -1)
+        if codes is None or len(codes) != matrix.shape[1]:
+            raise ValueError("codes must name every column of deductions_matrix")
+        pairs = zip(codes, matrix.T)
+    return [(code, np.broadcast_to(np.asarray(col, dtype=np.float64), (n,)))
+            for code, col in pairs]
+
+
+def deduction_cap(calculator, code, incomes, ages, year=None):
+    """Array form of IndianTaxCalculator.deduction_cap"""
+    ded_info = calculator.rules('old', year).deductions[code]
+    if 'calc' in ded_info:
+        max_ded = VECTOR_CALCS[ded_info['calc']](incomes)
+    else:
+        max_ded = np.full(incomes.shape, float(ded_info['limit']))
+    if 'senior_limit' in ded_info:
+        max_ded = np.where(ages >= 60, float(ded_info['senior_limit']), max_ded)
+    return max_ded
+
+
+def slab_tax(taxable_income, table):
+    """Tax before cess for an array of taxable incomes using a SlabTable"""
+    lows = np.asarray(table.lows, dtype=np.float64)
+    bracket = np.searchsorted(lows, taxable_income, side='left') - 1
+    i = np.maximum(bracket, 0)
+    highs = np.asarray(table.highs, dtype=np.float64)[i]
+    fractions = np.asarray(table.fractions, dtype=np.float64)[i]
+    cumulative = np.asarray(table.cumulative, dtype=np.float64)[i]
+    tax = cumulative + (np.minimum(taxable_income, highs) - lows[i]) * fractions
+    return np.where(bracket < 0, 0.0, tax)
+
+
+def rules_tax(taxable_income, rules):
+    """Array form of RuleSet.tax: slabs, 87A rebate, then cess"""
+    tax = slab_tax(taxable_income, rules.slab_table)
+    if rules.rebate:
+        ceiling, rebate = rules.rebate
+        tax = np.where(taxable_income <= ceiling, tax - np.minimum(tax, rebate), tax)
+    tax += tax * rules.cess
+    return np.maximum(tax, 0)
+
+
+def calculate_tax_batch(calculator, incomes, ages, deductions_matrix=None, regime='new', codes=None, year=None):
+    """Vectorized IndianTaxCalculator.calculate_tax over column arrays
+
+    deductions_matrix is either a dict of {code: column} or a 2-D array whose
+    columns are named by codes. Columns are applied in the given order, the
+    same way the scalar path walks the deductions dict.
+    """
+    rules = calculator.rules(regime, year)
+    catalogue = rules.deductions
+    incomes = np.asarray(incomes, dtype=np.float64)
+    n = incomes.shape[0]
+    ages = np.broadcast_to(np.asarray(ages), (n,))
+    standard = rules.standard_deduction
+
+    taxable_income = incomes - standard
+    applied_deductions = {'standard': np.full(n, float(standard))}
+
+    if rules.regime == 'old':
+        for ded_code, ded_amount in _columns(deductions_matrix, codes, n):
+            if ded_code not in catalogue:
+                continue
+            ded_info = catalogue[ded_code]
+            max_ded = deduction_cap(calculator, ded_code, incomes, ages, year)
+
+            if 'combined_with' in ded_info:
+                combined_code = ded_info['combined_with']
+                if combined_code in applied_deductions:
+                    remaining = catalogue[combined_code]['limit'] - applied_deductions[combined_code]
+                    max_ded = np.minimum(max_ded, remaining)
+
+            actual_ded = np.minimum(ded_amount, max_ded)
+            taxable_income -= actual_ded
+            applied_deductions[ded_code] = actual_ded
+
+    return rules_tax(taxable_income, rules), taxable_income, applied_deductions
@@ -0,0 +1,69 @@
+"""Compare the Flask and ASGI servers under bursts of identical queries
+
+    gunicorn -c gunicorn.conf.py wsgi:app                  # :8000
+    uvicorn asgi:app --port 8001
+    python -m benchmarks.bench_burst --target flask=http://127.0.0.1:8000/calculate \
+        --target asgi=http://127.0.0.1:8001/calculate --burst 64 --rounds 50
+
+Every round, --burst client threads post the same query at the same
+instant, the way a front end fans out when many users load a page at once.
+Each round uses a fresh query from the corpus so no round is answered from
+an earlier round's cache. Reports requests/sec and p50/p99 latency per target.
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.corpus import make_queries
+from benchmarks.loadtest import Client, percentile
+
+
+def run_bursts(url, queries, burst, rounds):
+    client = Client(url)
+    barrier = threading.Barrier(burst)
+    latencies = [[] for _ in range(burst)]
+    errors = [0] * burst
+
+    def worker(slot):
+        for round_no in range(rounds):
+            barrier.wait()
+            elapsed, ok = client.post(queries[round_no % len(queries)])
+            latencies[slot].append(elapsed)
+            errors[slot] += not ok
+
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(burst)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    merged = sorted(x for slot in latencies for x in slot)
+    return {
+        'requests': len(merged),
+        'errors': sum(errors),
+        'rps': len(merged) / wall,
+        'p50_ms': percentile(merged, 50) * 1000,
+        'p99_ms': percentile(merged, 99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', action='append', metavar='NAME=URL',
+                        help="server to test; repeat for each (default: flask on :8000, asgi on :8001)")
+    parser.add_argument('--burst', type=int, default=64, help="identical requests fired together")
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    targets = [t.split('=', 1) for t in args.target or [
+        'flask=http://127.0.0.1:8000/calculate', 'asgi=http://127.0.0.1:8001/calculate']]
+    queries = make_queries(args.rounds, seed=2024)
+    print(f"{'target':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, url in targets:
+        r = run_bursts(url, queries, args.burst, args.rounds)
+        print(f"{name:>8}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Accuracy and cost of entity recognition on free-form queries
+
+    python -m benchmarks.bench_entities [--queries 2000] [--extra 0 1000 5000]
+
+Accuracy is measured on seeded queries with a known answer, written with
+synonyms ('mediclaim', 'lic premium'), spaced or punctuated codes
+('section 80 c', '80ccd 1b'), single-letter typos and deduction amounts
+larger than the income. The legacy column is the original extraction
+(largest number as income, substring code matching, exact regime phrases).
+
+Cost is microseconds per parse_query with the recognizer's query memo
+cleared before every pass (cold; its per-word memos stay) and left warm,
+after growing the vocabulary by --extra random synonyms.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_parser import legacy_extract_deductions, legacy_extract_numbers
+from benchmarks.corpus import format_amount, make_queries
+from query_parser import RECOGNIZER, parse_query
+
+SEED = 42
+
+# Ways users write each code; synonyms get typos, codes do not
+SPELLINGS = {
+    '80C': ['80C', 'section 80 c', '80-C', 'lic premium', 'ppf', 'life insurance'],
+    '80CCD(1B)': ['80CCD(1B)', '80ccd 1b', 'additional nps'],
+    '80D': ['80D', '80 D', 'mediclaim', 'health insurance', 'medical insurance'],
+    '80E': ['80E', 'education loan', 'sec 80E'],
+    '80G': ['80G', 'donations', 'charity'],
+    '80TTA': ['80TTA', 'savings interest'],
+    '24(b)': ['24(b)', '24b', 'home loan interest', 'housing loan'],
+}
+INCOME_WORDS = ['salary', 'income', 'CTC', 'I earn', 'my income is', 'package']
+REGIMES = {'old': ['old regime', 'old tax regime', 'old regmie'], 'new': ['new regime', 'new tax regime', 'new regim']}
+COMMANDS = ['show deductions', 'show all deductions', 'list deductions', 'Show me all available deductions']
+
+
+def _typo(rng, word):
+    if len(word) < 6 or word[0].isdigit():
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == 1:
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+def _noisy(rng, phrase):
+    if rng.random() < 0.3:
+        return ' '.join(_typo(rng, word) for word in phrase.split())
+    return phrase
+
+
+def make_labelled(rng):
+    """(query, expected) with expected = (income, deductions, regime, command)"""
+    if rng.random() < 0.05:
+        return rng.choice(COMMANDS), (None, {}, None, 'show_deductions')
+    income = rng.randrange(3, 400) * 10000
+    parts = [f"{rng.choice(INCOME_WORDS)} {format_amount(rng, income)}"]
+    deductions = {}
+    for code in rng.sample(sorted(SPELLINGS), rng.randint(0, 3)):
+        amount = rng.randrange(1, 300) * 1000
+        deductions[code] = amount
+        written = _noisy(rng, rng.choice(SPELLINGS[code]))
+        parts.append(rng.choice([f"{written} {format_amount(rng, amount)}",
+                                 f"{format_amount(rng, amount)} in {written}"]))
+    regime = None
+    if rng.random() < 0.3:
+        regime = rng.choice(sorted(REGIMES))
+        parts.append(f"in {rng.choice(REGIMES[regime])}")
+    rng.shuffle(parts)
+    return ', '.join(parts), (income, deductions, regime, None)
+
+
+def new_answer(query):
+    parsed = parse_query(query)
+    return parsed.income, parsed.deductions, parsed.regime, parsed.command
+
+
+def legacy_answer(query):
+    numbers = legacy_extract_numbers(query)
+    lower = query.lower()
+    regime = 'old' if 'old regime' in lower else 'new' if 'new regime' in lower else None
+    command = 'show_deductions' if 'show deductions' in lower or 'list deductions' in lower else None
+    try:
+        deductions = legacy_extract_deductions(query)
+    except IndexError:  # The old code crashed when a code's case differed ('80d')
+        deductions = None
+    return max(numbers) if numbers else None, deductions, regime, command
+
+
+def accuracy(labelled, answer):
+    """Share of queries with each field right, and with everything right"""
+    fields = ('income', 'deductions', 'regime', 'command')
+    right = dict.fromkeys(fields + ('all',), 0)
+    for query, expected in labelled:
+        got = answer(query)
+        for field, e, g in zip(fields, expected, got):
+            right[field] += e == g
+        right['all'] += tuple(expected) == tuple(got)
+    return {field: count / len(labelled) for field, count in right.items()}
+
+
+def cost_us(queries, repeat, cold):
+    best = float('inf')
+    for _ in range(repeat):
+        if cold:
+            RECOGNIZER.invalidate()
+        start = time.perf_counter()
+        for query in queries:
+            parse_query(query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e6
+
+
+def grow_vocabulary(n, rng):
+    """Add n random one- to three-word synonyms for real codes"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    codes = sorted(SPELLINGS)
+    for _ in range(n):
+        phrase = ' '.join(''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+                          for _ in range(rng.randint(1, 3)))
+        RECOGNIZER.add(phrase, 'deduction', rng.choice(codes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--extra', type=int, nargs='+', default=[0, 1000, 5000],
+                        help="vocabulary sizes to time, as synonyms added on top of the built-in ones")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(SEED)
+    labelled = [make_labelled(rng) for _ in range(args.queries)]
+    legacy, new = accuracy(labelled, legacy_answer), accuracy(labelled, new_answer)
+    print(f"{'field':<12}{'legacy':>10}{'recognizer':>12}")
+    for field in legacy:
+        print(f"{field:<12}{legacy[field]:>10.1%}{new[field]:>12.1%}")
+
+    queries = make_queries(args.queries, seed=SEED) + [query for query, _ in labelled]
+    print(f"\n{'vocab words':<14}{'cold us/q':>10}{'warm us/q':>10}")
+    added = 0
+    for extra in sorted(args.extra):
+        grow_vocabulary(extra - added, rng)
+        added = extra
+        cold = cost_us(queries, args.repeat, cold=True)
+        warm = cost_us(queries, args.repeat, cold=False)
+        print(f"{len(RECOGNIZER):<14}{cold:>10.1f}{warm:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
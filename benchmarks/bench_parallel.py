@@ -0,0 +1,42 @@
+"""Scaling of parallel.compare_parallel across worker counts
+
+    python -m benchmarks.bench_parallel [--rows 10000000] [--workers 1 2 4 8]
+
+Rows are generated lazily from a fixed seed, so memory stays flat and every
+worker count sees the same dataset.
+"""
+import argparse
+import random
+import time
+
+from parallel import compare_parallel
+
+CODES = ('80C', '80CCD(1B)', '80D', '80E', '24(b)', '80TTA')
+
+
+def synthetic_rows(n, seed=7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        deductions = {code: rng.randrange(0, 200000, 1000) for code in rng.sample(CODES, rng.randint(0, 4))}
+        yield rng.randrange(200000, 5000000, 1000), rng.randint(21, 80), deductions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    print(f"{'workers':>8}{'seconds':>10}{'rows/s':>14}{'speedup':>9}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        count = sum(1 for _ in compare_parallel(synthetic_rows(args.rows), workers, args.chunk_size))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8}{elapsed:>10.2f}{count / elapsed:>14,.0f}{baseline / elapsed:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Compare the single-pass query parser with the old multi-scan extraction
+
+    python -m benchmarks.bench_parser [--queries 2000] [--repeat 5]
+"""
+import argparse
+import re
+import time
+
+from benchmarks.corpus import make_queries
+from query_parser import DEDUCTION_CODES, RECOGNIZER, parse_query
+
+
+def legacy_extract_numbers(text):
+    numbers = [int(num.replace(',', '')) for num in re.findall(r'\d[\d,]*\d+', text)]
+    patterns = [
+        (r'(\d+\.?\d*)\s*(la[ck]h)', 100000),
+        (r'(\d+\.?\d*)\s*(crore)', 10000000),
+        (r'(\d+)\s*(thousand|k)', 1000),
+        (r'(\d+)\s*(l|cr|k)\b', None)
+    ]
+    units = {'l': 100000, 'cr': 10000000, 'k': 1000}
+    for pattern, multiplier in patterns:
+        for match in re.finditer(pattern, text.lower()):
+            num = float(match.group(1))
+            numbers.append(int(num * (multiplier or units[match.group(2)])))
+    return numbers
+
+
+def legacy_extract_deductions(text):
+    deductions = {}
+    text_lower = text.lower()
+    for code in DEDUCTION_CODES + ('standard',):
+        if code.lower() in text_lower:
+            match = re.compile(rf"{code}[^\d]*(\d+[\d,]*\d+)", re.IGNORECASE).search(text)
+            if match:
+                deductions[code] = int(match.group(1).replace(',', ''))
+            elif any(char.isdigit() for char in text.split(code)[1][:20]):
+                numbers = re.findall(r'\d+', text.split(code)[1][:20])
+                if numbers:
+                    deductions[code] = int(numbers[0])
+    if 'home loan' in text_lower or 'housing loan' in text_lower:
+        numbers = re.findall(r'\d+', text)
+        if len(numbers) > 1:
+            deductions['24(b)'] = int(numbers[-1])
+    return deductions
+
+
+def legacy_parse(query):
+    """What process_query did before: one scan per pattern and per code"""
+    query.lower()
+    numbers = legacy_extract_numbers(query)
+    re.search(r'age\s*(\d+)', query.lower())
+    deductions = legacy_extract_deductions(query)
+    'old regime' in query.lower() or 'new regime' in query.lower()
+    return numbers, deductions
+
+
+def timed(fn, queries, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        RECOGNIZER.invalidate()  # Time parsing, not the per-query memo
+        start = time.perf_counter()
+        for query in queries:
+            fn(query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    queries = make_queries(args.queries)
+    print(f"{'corpus':<22}{'legacy us/q':>14}{'parser us/q':>14}{'speedup':>10}")
+    for scale in (1, 4, 16):
+        corpus = [' '.join([q] * scale) for q in queries[:max(1, len(queries) // scale)]]
+        chars = sum(map(len, corpus)) / len(corpus)
+        old = timed(legacy_parse, corpus, args.repeat)
+        new = timed(parse_query, corpus, args.repeat)
+        print(f"{f'~{chars:.0f} chars/query':<22}{old:>14.1f}{new:>14.1f}{old / new:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Import-time budget for the calculation core
+
+    python -m benchmarks.bench_startup [--runs 7] [--budget-ms 10]
+
+Each run imports a module in a fresh interpreter with -X importtime and
+takes its cumulative import time; the best of --runs is reported, which
+filters out scheduler noise. The same fresh process also times building an
+IndianTaxCalculator and its first calculate_tax, the rest of what a CLI
+call or new pool worker pays before doing useful work.
+
+Exits with status 1 when importing `calculator` exceeds --budget-ms or
+pulls in any of the heavier layers (chatbot, parser, numpy, Flask).
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = ('calculator', 't1', 'app')
+# Layers the core must not import
+FORBIDDEN = ('t1', 'query_parser', 'render', 'sessions', 'numpy', 'flask', 're')
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+from calculator import IndianTaxCalculator
+calculator = IndianTaxCalculator()
+built = time.perf_counter()
+calculator.calculate_tax(1500000, 30, {'80C': 150000}, 'old')
+done = time.perf_counter()
+print((built - start) * 1e6, (done - built) * 1e6,
+      ','.join(m for m in %r if m in sys.modules))
+""" % (FORBIDDEN,)
+
+
+def _root():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python(*args):
+    env = dict(os.environ, PYTHONPATH=_root() + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True,
+                          cwd=_root(), env=env)
+
+
+def import_time_us(module):
+    """Cumulative import time of module in a fresh interpreter, in microseconds"""
+    stderr = _python('-X', 'importtime', '-c', f'import {module}').stderr
+    for line in reversed(stderr.splitlines()):
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def probe():
+    """(import + construct us, first calculate_tax us, forbidden modules loaded)"""
+    built, first, loaded = (_python('-c', _PROBE).stdout.split(' ') + [''])[:3]
+    return float(built), float(first), [m for m in loaded.strip().split(',') if m]
+
+
+def run(runs=7, modules=MODULES):
+    results = {}
+    for module in modules:
+        try:
+            results[module] = min(import_time_us(module) for _ in range(runs))
+        except subprocess.CalledProcessError:
+            results[module] = None  # e.g. Flask not installed
+    probes = [probe() for _ in range(runs)]
+    return {
+        'import_us': results,
+        'construct_us': min(p[0] for p in probes),
+        'first_call_us': min(p[1] for p in probes),
+        'forbidden': sorted(set().union(*(p[2] for p in probes))),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=10.0,
+                        help="maximum cumulative import time of the calculator module")
+    args = parser.parse_args(argv)
+
+    report = run(args.runs)
+    print(f"{'module':<14}{'import ms':>10}")
+    for module, us in report['import_us'].items():
+        print(f"{module:<14}{'-' if us is None else f'{us / 1000:.1f}':>10}")
+    print(f"\nimport calculator + IndianTaxCalculator(): {report['construct_us'] / 1000:.1f} ms")
+    print(f"first calculate_tax:                       {report['first_call_us']:.0f} us")
+
+    failed = False
+    core = report['import_us']['calculator']
+    if core > args.budget_ms * 1000:
+        print(f"\nOVER BUDGET: calculator imports in {core / 1000:.1f} ms (budget {args.budget_ms:g} ms)")
+        failed = True
+    if report['forbidden']:
+        print(f"\nLAYERING: calculator pulls in {', '.join(report['forbidden'])}")
+        failed = True
+    if not failed:
+        print(f"\nok: within the {args.budget_ms:g} ms budget")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Check that incremental session results match a full calculation
+
+    python -m benchmarks.check_sessions [--sessions 2000] [--turns 12] [--seed 42]
+
+Replays seeded random conversations through SessionState.updated: income
+changes (often to the same value), ages either side of 60, claims under the
+80C pool and its members (80CCC, 80CCD(1)), senior-capped and formula-capped
+codes, removals, regime switches and financial-year changes. After every
+turn both regimes and the reported result must equal calculate_tax and
+compare_regimes run from scratch on the same profile. Deductions are kept in
+catalogue order, as TaxChatbot.session_answer keeps them, since the 80C pool
+caps its members by what was applied before them.
+
+Exits with status 1 on the first mismatch.
+"""
+import argparse
+import random
+import sys
+
+from calculator import IndianTaxCalculator
+from rules import FINANCIAL_YEARS
+from sessions import SessionState
+
+SEED = 42
+CODES = ('80C', '80CCC', '80CCD(1)', '80CCD(1B)', '80D', '80DDB', '80E', '80G', '80TTA', '80TTB', '24(b)', '80GG')
+REGIMES = ('compare', 'old', 'new')
+
+
+def _turn(rng, state):
+    """Keyword arguments for one random follow-up to state"""
+    change = {}
+    kind = rng.choice(('income', 'age', 'claim', 'claim', 'claim', 'remove', 'regime', 'year'))
+    if kind == 'income' or state.income is None:
+        change['income'] = state.income if state.income and rng.random() < 0.3 else rng.randrange(2, 400) * 10000
+    if kind == 'age':
+        change['age'] = rng.choice((30, 45, 59, 60, 61, 75, 80))
+    if kind in ('claim', 'remove'):
+        deductions = dict(state.deductions)
+        if kind == 'remove' and deductions:
+            del deductions[rng.choice(sorted(deductions))]
+        else:
+            deductions[rng.choice(CODES)] = rng.choice((0, 10000, 50000, 100000, 150000, 200000, 400000))
+        change['deductions'] = deductions
+    if kind == 'regime':
+        change['regime'] = rng.choice(REGIMES)
+    if kind == 'year':
+        change['year'] = rng.choice(FINANCIAL_YEARS)
+    return change
+
+
+def _catalogue_order(calculator, deductions):
+    return {code: deductions[code] for code in calculator.deductions if code in deductions}
+
+
+def check(calculator, sessions, turns, seed):
+    """(turns checked, incremental turns, first mismatch or None)"""
+    rng = random.Random(seed)
+    checked = incremental_turns = 0
+    for _ in range(sessions):
+        state = SessionState()
+        for _ in range(turns):
+            change = _turn(rng, state)
+            if 'deductions' in change:
+                change['deductions'] = _catalogue_order(calculator, change['deductions'])
+            state, incremental = state.updated(calculator, **change)
+            checked += 1
+            incremental_turns += incremental
+            profile = (state.income, state.age, state.deductions)
+            expected = {
+                'old': calculator.calculate_tax(*profile, 'old', state.year),
+                'new': calculator.calculate_tax(*profile, 'new', state.year),
+            }
+            got = {'old': tuple(state.old[:3]), 'new': tuple(state.new[:3])}
+            if got != expected:
+                return checked, incremental_turns, (change, profile, state.year, got, expected)
+            full = (calculator.compare_regimes(*profile, state.year) if state.regime == 'compare'
+                    else dict(zip(('tax', 'taxable', 'deductions'), expected[state.regime])))
+            result = state.result(state.regime, calculator)
+            if result != full:
+                return checked, incremental_turns, (change, profile, state.year, result, full)
+    return checked, incremental_turns, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--turns', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args(argv)
+
+    checked, incremental, mismatch = check(IndianTaxCalculator(), args.sessions, args.turns, args.seed)
+    if mismatch is not None:
+        change, profile, year, got, expected = mismatch
+        print(f"MISMATCH after {checked} turns: {change} on income, age, deductions = {profile} ({year})")
+        print(f"  session: {got}")
+        print(f"  full:    {expected}")
+        return 1
+    print(f"ok: {checked} turns ({incremental} incremental) match a full calculate_tax")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Deterministic synthetic queries and payroll rows for the benchmarks"""
+import random
+
+DEDUCTION_CODES = ('80C', '80CCD(1B)', '80D', '80E', '80G', '80TTA', '24(b)', '80CCC', '80DDB', '80EEA')
+
+
+def format_amount(rng, value):
+    """Write value the way users do: 15L, 15 lakh, 1,50,000, 50K, 1.2Cr, 2 crore..."""
+    style = rng.randrange(7)
+    if style == 0 and value % 100000 == 0:
+        return f"{value // 100000}L"
+    if style == 1 and value >= 100000:
+        return f"{value / 100000:g} {rng.choice(['lakh', 'lac', 'lakhs'])}"
+    if style == 2:
+        digits = str(value)
+        head, tail = digits[:-3], digits[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        return ','.join(groups + [tail])
+    if style == 3 and value % 1000 == 0 and value < 100000:
+        return f"{value // 1000}{rng.choice(['K', 'k', ' thousand'])}"
+    if style == 4 and value >= 10000000:
+        return f"{value / 10000000:g}Cr"
+    if style == 5 and value >= 10000000:
+        return f"{value / 10000000:g} crore"
+    return str(value)
+
+
+def make_query(rng):
+    # Mostly salaried incomes, with a tail in crores
+    income = rng.randrange(3, 400) * 10000 if rng.random() < 0.9 else rng.randrange(10, 300) * 1000000
+    parts = [rng.choice(["My income is", "I earn", "Compare tax for", "Salary", "CTC"]),
+             format_amount(rng, income)]
+    if rng.random() < 0.3:
+        parts.append(f"age {rng.randint(22, 85)}")
+    if rng.random() < 0.2:
+        parts.append(rng.choice(["in old regime", "in new regime"]))
+    for code in rng.sample(DEDUCTION_CODES, rng.randint(0, 4)):
+        amount = format_amount(rng, rng.randrange(1, 200) * 1000)
+        parts.append(rng.choice([f"with {code} {amount}", f"and {amount} in {code}", f"{code}: {amount}"]))
+    return ' '.join(parts)
+
+
+def make_queries(n, seed=42):
+    """n realistic queries, the same ones for a given seed"""
+    rng = random.Random(seed)
+    return [make_query(rng) for _ in range(n)]
+
+
+def make_payroll(n, seed=7):
+    """n (employee_id, income, age, deductions) records, as bulk.read_records yields them"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        deductions = {code: rng.randrange(0, 200000, 1000)
+                      for code in rng.sample(DEDUCTION_CODES, rng.randint(0, 4))}
+        rows.append((f'E{i:07d}', rng.randrange(200000, 5000000, 1000), rng.randint(21, 80), deductions))
+    return rows
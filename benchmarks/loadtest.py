@@ -0,0 +1,92 @@
+"""Load-test the /calculate endpoint at several concurrency levels
+
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000/calculate \
+        --concurrency 1 4 16 64 --requests 2000
+
+Each client thread keeps one HTTP/1.1 connection open and posts queries
+from the benchmark corpus. Reports requests/sec and p50/p99 latency.
+"""
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.corpus import make_queries
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Client:
+    """One keep-alive connection per thread"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port, self.path = parts.hostname, parts.port or 80, parts.path or '/'
+        self.local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return conn
+
+    def post(self, query):
+        body = urlencode({'query': query})
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        start = time.perf_counter()
+        try:
+            conn = self._connection()
+            conn.request('POST', self.path, body, headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            self.local.conn = None
+            ok = False
+        return time.perf_counter() - start, ok
+
+
+def run_level(url, queries, concurrency, total):
+    client = Client(url)
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, ok in pool.map(client.post, (queries[i % len(queries)] for i in range(total))):
+            latencies.append(elapsed)
+            errors += not ok
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': errors,
+        'rps': total / wall,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000/calculate')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--requests', type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument('--queries', type=int, default=500, help="distinct queries to cycle through")
+    args = parser.parse_args(argv)
+
+    queries = make_queries(args.queries)
+    print(f"{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for level in args.concurrency:
+        r = run_level(args.url, queries, level, args.requests)
+        print(f"{r['concurrency']:>6}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
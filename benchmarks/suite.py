@@ -0,0 +1,203 @@
+"""Benchmark suite with saved baselines and a regression gate
+
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --output current.json
+    python -m benchmarks.suite compare baseline.json current.json --tolerance 0.15
+    python -m benchmarks.suite check baseline.json        # run + compare in one go
+
+Every case runs over the same seeded corpus of queries or payroll rows.
+Throughput comes from the fastest of --repeat passes; p50/p99 latencies
+from per-call timings across all passes. Each case also records a checksum
+of its outputs, so a change that gets faster by computing something else is
+caught too. compare exits with status 1 when any case loses more than
+--tolerance of its throughput or its checksum changes. The p50 change is
+shown alongside but does not gate, since single-call timings are far
+noisier than best-of-N totals.
+"""
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import time
+
+from benchmarks.corpus import make_payroll, make_queries
+from query_parser import RECOGNIZER
+from t1 import TaxChatbot
+
+SEED = 42
+
+
+def _checksum(values):
+    return hashlib.sha256(repr(values).encode()).hexdigest()[:16]
+
+
+def _measure(fn, items, repeat, before_pass=None):
+    best, latencies, outputs = float('inf'), [], None
+    clock = time.perf_counter
+    for item in items[:200]:
+        fn(item)  # Warm up regex, bisect and allocator paths before timing
+    for _ in range(repeat):
+        if before_pass:
+            before_pass()
+        results = []
+        start = clock()
+        for item in items:
+            t = clock()
+            results.append(fn(item))
+            latencies.append(clock() - t)
+        best = min(best, clock() - start)
+        outputs = results
+    latencies.sort()
+    return {
+        'ops': len(items),
+        'ops_per_sec': len(items) / best,
+        'mean_us': sum(latencies) / len(latencies) * 1e6,
+        'p50_us': latencies[len(latencies) // 2] * 1e6,
+        'p99_us': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+        'checksum': _checksum(outputs),
+    }
+
+
+def cases(queries, payroll):
+    """{name: (fn, items, before_pass)} for every benchmarked stage"""
+    chatbot = TaxChatbot()
+    calculator = chatbot.calculator
+
+    def cold():
+        chatbot.invalidate_caches()
+        RECOGNIZER.invalidate()
+
+    def compare(row):
+        _, income, age, deductions = row
+        return chatbot._compare_regimes(income, age, deductions)
+
+    def tax(regime):
+        def run(row):
+            _, income, age, deductions = row
+            return calculator.calculate_tax(income, age, deductions, regime)
+        return run
+
+    return {
+        # Parse results are memoized per query, so parsing cases start cold too
+        'extract_numbers': (calculator.extract_numbers, queries, RECOGNIZER.invalidate),
+        'extract_deductions': (chatbot.extract_deductions, queries, RECOGNIZER.invalidate),
+        'calculate_tax_old': (tax('old'), payroll, None),
+        'calculate_tax_new': (tax('new'), payroll, None),
+        # Caches are cleared before each pass so every call does the work
+        'compare_regimes': (compare, payroll, chatbot.invalidate_caches),
+        'process_query': (chatbot.process_query, queries, cold),
+        'process_query_cached': (chatbot.process_query, queries, None),
+    }
+
+
+def run(n_queries=2000, n_rows=2000, repeat=5, only=None):
+    queries = make_queries(n_queries, seed=SEED)
+    payroll = make_payroll(n_rows, seed=SEED)
+    results = {}
+    for name, (fn, items, before_pass) in cases(queries, payroll).items():
+        if only and name not in only:
+            continue
+        results[name] = _measure(fn, items, repeat, before_pass)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'seed': SEED,
+            'queries': n_queries,
+            'rows': n_rows,
+            'repeat': repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance=0.15):
+    """(rows, failed) comparing two run() outputs case by case"""
+    rows, failed = [], False
+    for name, base in baseline['results'].items():
+        cur = current['results'].get(name)
+        if cur is None:
+            rows.append((name, base['ops_per_sec'], None, None, None, 'MISSING'))
+            failed = True
+            continue
+        throughput = cur['ops_per_sec'] / base['ops_per_sec'] - 1
+        latency = cur['p50_us'] / base['p50_us'] - 1
+        problems = []
+        if throughput < -tolerance:
+            problems.append('throughput')
+        if cur['checksum'] != base['checksum']:
+            problems.append('checksum')
+        failed = failed or bool(problems)
+        rows.append((name, base['ops_per_sec'], cur['ops_per_sec'], throughput, latency,
+                     'REGRESSED: ' + ', '.join(problems) if problems else 'ok'))
+    return rows, failed
+
+
+def print_results(report):
+    print(f"{'case':<22}{'ops/s':>12}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+    for name, r in report['results'].items():
+        print(f"{name:<22}{r['ops_per_sec']:>12,.0f}{r['mean_us']:>10.1f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}")
+
+
+def print_comparison(rows, tolerance):
+    print(f"{'case':<22}{'base ops/s':>12}{'now ops/s':>12}{'ops/s':>9}{'p50':>9}  (tolerance {tolerance:.0%})")
+    for name, base, cur, throughput, latency, status in rows:
+        if cur is None:
+            print(f"{name:<22}{base:>12,.0f}{'-':>12}{'-':>9}{'-':>9}  {status}")
+        else:
+            print(f"{name:<22}{base:>12,.0f}{cur:>12,.0f}{throughput:>+9.1%}{latency:>+9.1%}  {status}")
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name in ('run', 'check'):
+        sub = commands.add_parser(name)
+        if name == 'check':
+            sub.add_argument('baseline')
+            sub.add_argument('--tolerance', type=float, default=0.15)
+        sub.add_argument('--output', help="write the results as JSON here")
+        sub.add_argument('--queries', type=int, default=2000)
+        sub.add_argument('--rows', type=int, default=2000)
+        sub.add_argument('--repeat', type=int, default=5)
+        sub.add_argument('--case', action='append', help="run only this case (repeatable)")
+    sub = commands.add_parser('compare')
+    sub.add_argument('baseline')
+    sub.add_argument('current')
+    sub.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        baseline, current = _load(args.baseline), _load(args.current)
+    else:
+        if args.command == 'check':
+            # Re-run with the baseline's corpus so checksums are comparable
+            baseline = _load(args.baseline)
+            meta = baseline['meta']
+            args.queries, args.rows = meta['queries'], meta['rows']
+            if args.case:
+                baseline['results'] = {k: v for k, v in baseline['results'].items() if k in args.case}
+        current = run(args.queries, args.rows, args.repeat, args.case)
+        print_results(current)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+        if args.command == 'run':
+            return 0
+        print()
+
+    rows, failed = compare(baseline, current, args.tolerance)
+    print_comparison(rows, args.tolerance)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
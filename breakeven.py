@@ -0,0 +1,119 @@
+"""Closed-form regime break-even points and tax curves
+
+Both regimes' tax is piecewise linear in taxable income, so the deduction
+level at which the old regime catches up with the new one is found by
+inverting the old regime's tax segments at the new-regime tax, with no
+grid search.
+"""
+from collections import namedtuple
+
+from calculator import IndianTaxCalculator
+
+# Tax (with cess) is tax_at_start + slope * (x - start) for start <= x <= end.
+# Where the 87A rebate makes tax jump, neighbouring segments share an
+# endpoint and the lower of their two values applies there.
+Segment = namedtuple('Segment', 'start end tax_at_start slope')
+
+
+def breakeven(income, age, year=None, calculator=None):
+    """Total deductions (beyond the standard deduction) at which both regimes cost the same
+
+    Claiming at least this much makes the old regime no worse than the new
+    one; 0 means the old regime already wins without any deductions.
+    """
+    calculator = calculator or IndianTaxCalculator()
+    old = calculator.rules('old', year)
+    new_tax = calculator.calculate_tax(income, age, {}, 'new', year)[0]
+    return max(0, income - old.standard_deduction - old.taxable_for_tax(new_tax))
+
+
+def breakeven_batch(incomes, ages, year=None, calculator=None):
+    """breakeven for whole payroll columns in one vectorized call (needs numpy)"""
+    import numpy as np
+
+    calculator = calculator or IndianTaxCalculator()
+    old = calculator.rules('old', year)
+    incomes = np.asarray(incomes, dtype=np.float64)
+    new_tax = calculator.calculate_tax_batch(incomes, ages, None, 'new', year=year)[0]
+    limit = new_tax / (1 + old.cess)
+
+    # Same walk as RuleSet.taxable_for_tax, one segment at a time across all rows
+    ceiling = np.full(incomes.shape, float(old.slab_table.lows[0]))
+    for start, end, tax, rate in old.tax_segments():
+        reach = np.full(incomes.shape, float(end)) if rate == 0 else np.minimum(end, start + (limit - tax) / rate)
+        ceiling = np.where(tax <= limit, np.maximum(ceiling, reach), ceiling)
+    return np.maximum(0, incomes - old.standard_deduction - ceiling)
+
+
+def _shifted(rules, offset, sign):
+    """Tax segments as a function of x >= 0 where taxable income = offset + sign * x"""
+    cess = 1 + rules.cess
+    segments = []
+    for low, high, tax, fraction in rules.tax_segments():
+        if sign > 0:
+            start, end = low - offset, high - offset
+        else:
+            start, end = offset - high, offset - low
+        start = max(start, 0)
+        if end <= start:
+            continue
+        # Tax at the segment's left end in x
+        taxable = offset + sign * start
+        at_start = tax + (min(taxable, high) - low) * fraction
+        segments.append(Segment(start, end, at_start * cess, sign * fraction * cess))
+    return sorted(segments)
+
+
+def income_curve(deductions=0, year=None, calculator=None):
+    """Tax versus gross income for both regimes, as lists of Segments
+
+    deductions is the total old-regime deduction on top of the standard one.
+    """
+    calculator = calculator or IndianTaxCalculator()
+    old, new = calculator.rules('old', year), calculator.rules('new', year)
+    return {
+        'old': _shifted(old, -(old.standard_deduction + deductions), 1),
+        'new': _shifted(new, -new.standard_deduction, 1),
+    }
+
+
+def deduction_curve(income, year=None, calculator=None):
+    """Tax versus total old-regime deductions at a fixed income, as lists of Segments
+
+    The new regime ignores these deductions, so its curve is a single flat segment.
+    """
+    calculator = calculator or IndianTaxCalculator()
+    old, new = calculator.rules('old', year), calculator.rules('new', year)
+    return {
+        'old': _shifted(old, income - old.standard_deduction, -1),
+        'new': [Segment(0, float('inf'), new.tax(income - new.standard_deduction), 0.0)],
+    }
+
+
+def deduction_curve_batch(incomes, year=None, calculator=None):
+    """Old-regime deduction_curve breakpoints for a payroll column (needs numpy)
+
+    Returns arrays of shape (employees, segments) for start, end, tax_at_start
+    and slope; segments that fall entirely below zero deductions have
+    start == end.
+    """
+    import numpy as np
+
+    calculator = calculator or IndianTaxCalculator()
+    old = calculator.rules('old', year)
+    cess = 1 + old.cess
+    incomes = np.asarray(incomes, dtype=np.float64)[:, None]
+    low, high, tax, fraction = (np.asarray(col, dtype=np.float64)[None, :]
+                                for col in zip(*old.tax_segments()))
+    offset = incomes - old.standard_deduction
+    end = np.maximum(offset - low, 0)
+    start = np.minimum(np.maximum(offset - high, 0), end)
+    taxable = offset - start
+    at_start = tax + (np.minimum(taxable, high) - low) * fraction
+    at_start = np.where(taxable > low, at_start, tax)
+    return {
+        'start': start,
+        'end': end,
+        'tax_at_start': at_start * cess,
+        'slope': np.broadcast_to(-fraction * cess, start.shape),
+    }
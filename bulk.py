@@ -0,0 +1,187 @@
+"""Bulk tax computation for CSV/JSONL payroll files
+
+    python bulk.py employees.csv results.csv [--chunk-size 10000] [--checkpoint run.ckpt]
+
+Input rows carry employee_id, income, age and one column per deduction code
+(80C, 80D, 24(b), ...); JSONL rows may instead nest them under "deductions".
+Rows stream through in fixed-size chunks, so memory stays flat whatever the
+file size. After every chunk the output is flushed and a checkpoint records
+how far the run got; rerunning with the same checkpoint resumes from there.
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+from calculator import IndianTaxCalculator
+
+OUTPUT_FIELDS = ('employee_id', 'income', 'age', 'old_tax', 'new_tax',
+                 'old_taxable', 'new_taxable', 'recommended', 'savings')
+
+
+def _format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def _amount(value):
+    if value is None or value == '':
+        return 0
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def read_records(path, fmt=None, codes=None):
+    """Yield (employee_id, income, age, deductions) from a CSV or JSONL file"""
+    codes = set(codes or IndianTaxCalculator().deductions)
+    codes.discard('standard')
+    with open(path, newline='', encoding='utf-8') as f:
+        if _format(path, fmt) == 'jsonl':
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            nested = row.get('deductions') or {}
+            deductions = {code: _amount(amount) for code, amount in nested.items() if code in codes}
+            for code in codes.intersection(row):
+                amount = _amount(row[code])
+                if amount:
+                    deductions[code] = amount
+            age = row.get('age')
+            yield (row.get('employee_id'), _amount(row.get('income')),
+                   int(_amount(age)) if age not in (None, '') else 30, deductions)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def compute_chunk(calculator, chunk):
+    """Compare both regimes for a chunk of records, returning output rows"""
+    ids, incomes, ages, deduction_rows = zip(*chunk)
+    # Catalogue order, the same order the chatbot applies parsed deductions in
+    present = set().union(*deduction_rows)
+    columns = {code: [row.get(code, 0) for row in deduction_rows]
+               for code in calculator.deductions if code in present}
+    old_tax, old_taxable, _ = calculator.calculate_tax_batch(incomes, ages, columns, 'old')
+    new_tax, new_taxable, _ = calculator.calculate_tax_batch(incomes, ages, None, 'new')
+    rows = []
+    for i, employee_id in enumerate(ids):
+        old, new = float(old_tax[i]), float(new_tax[i])
+        rows.append({
+            'employee_id': employee_id,
+            'income': incomes[i],
+            'age': ages[i],
+            'old_tax': round(old, 2),
+            'new_tax': round(new, 2),
+            'old_taxable': float(old_taxable[i]),
+            'new_taxable': float(new_taxable[i]),
+            'recommended': 'old' if old < new else 'new',
+            'savings': round(abs(old - new), 2),
+        })
+    return rows
+
+
+def iter_results(records, chunk_size=10000, calculator=None):
+    """Stream result rows for an iterable of (employee_id, income, age, deductions)"""
+    calculator = calculator or IndianTaxCalculator()
+    for chunk in chunked(records, chunk_size):
+        yield from compute_chunk(calculator, chunk)
+
+
+def _encode(rows, fmt, header):
+    buf = io.StringIO()
+    if fmt == 'jsonl':
+        for row in rows:
+            buf.write(json.dumps(row) + '\n')
+    else:
+        writer = csv.DictWriter(buf, OUTPUT_FIELDS, lineterminator='\n')
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+    return buf.getvalue().encode('utf-8')
+
+
+def _load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return None
+
+
+def _save_checkpoint(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def process_file(input_path, output_path, chunk_size=10000, checkpoint=None,
+                 input_format=None, output_format=None, progress=None):
+    """Compute taxes for every row of input_path into output_path
+
+    progress, if given, is called after each chunk with (rows_done, rows_per_sec).
+    Returns the total number of rows written.
+    """
+    out_fmt = _format(output_path, output_format)
+    state = _load_checkpoint(checkpoint)
+    if state and state.get('input') != os.path.abspath(input_path):
+        raise ValueError(f"checkpoint {checkpoint} belongs to {state.get('input')}")
+    done = state['rows'] if state else 0
+    offset = state['bytes'] if state else 0
+
+    calculator = IndianTaxCalculator()
+    records = itertools.islice(read_records(input_path, input_format, calculator.deductions), done, None)
+    start, started_at = done, time.perf_counter()
+
+    mode = 'r+b' if state else 'wb'
+    with open(output_path, mode) as out:
+        # Drop anything written after the last checkpoint
+        out.seek(offset)
+        out.truncate()
+        for chunk in chunked(records, chunk_size):
+            out.write(_encode(compute_chunk(calculator, chunk), out_fmt, header=(done == 0)))
+            out.flush()
+            os.fsync(out.fileno())
+            done += len(chunk)
+            if checkpoint:
+                _save_checkpoint(checkpoint, {'input': os.path.abspath(input_path),
+                                              'rows': done, 'bytes': out.tell()})
+            if progress:
+                elapsed = time.perf_counter() - started_at
+                progress(done, (done - start) / elapsed if elapsed else 0.0)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute old/new regime tax for a payroll file")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--checkpoint', help="checkpoint file; an existing one resumes the run")
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'))
+    parser.add_argument('--output-format', choices=('csv', 'jsonl'))
+    args = parser.parse_args(argv)
+
+    def report(rows, rate):
+        print(f"\r{rows:,} rows ({rate:,.0f} rows/s)", end='', file=sys.stderr, flush=True)
+
+    total = process_file(args.input, args.output, args.chunk_size, args.checkpoint,
+                         args.input_format, args.output_format, report)
+    print(f"\nDone: {total:,} rows written to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Tax calculation core: IndianTaxCalculator without the chatbot layer
+
+Importing this module loads only the compiled rules registry (rules,
+slabs), so CLI tools, batch jobs and pool workers start quickly. The query
+parser and numpy are imported on first use by extract_numbers and
+calculate_tax_batch. t1 re-exports IndianTaxCalculator for existing code.
+"""
+from rules import CAP_FORMULAS, DEFAULT_FY, get_rules
+
+
+class IndianTaxCalculator:
+    def __init__(self, year=DEFAULT_FY):
+        # Rules come from the shared, precompiled registry; nothing is rebuilt per instance
+        self.year = year
+        self.rules_old = get_rules(year, 'old')
+        self.rules_new = get_rules(year, 'new')
+        self.slab_table_old = self.rules_old.slab_table
+        self.slab_table_new = self.rules_new.slab_table
+        self.tax_slabs_old = self.slab_table_old.slabs
+        self.tax_slabs_new = self.slab_table_new.slabs
+        self.deductions = self.rules_old.deductions
+
+    def rules(self, regime, year=None):
+        """RuleSet for regime in year (defaults to this calculator's year)
+
+        Raises ValueError for an unknown regime or year, as get_rules does.
+        """
+        if year is None or year == self.year:
+            regime_name = regime.lower()
+            if regime_name == 'old':
+                return self.rules_old
+            if regime_name == 'new':
+                return self.rules_new
+        return get_rules(year or self.year, regime)
+
+    def convert_word_to_number(self, amount_str):
+        """Convert Indian number words to numeric value"""
+        import re
+        amount_str = amount_str.lower().replace(',', '').replace(' ', '')
+        
+        # Handle crore
+        if 'crore' in amount_str:
+            num = float(amount_str.replace('crore', '')) * 10000000
+            return int(num)
+        
+        # Handle lakh
+        if 'lac' in amount_str or 'lakh' in amount_str:
+            num = float(re.sub(r'la[ck]h', '', amount_str)) * 100000
+            return int(num)
+        
+        # Handle thousand
+        if 'thousand' in amount_str or 'k' in amount_str:
+            num = float(re.sub(r'thousand|k', '', amount_str)) * 1000
+            return int(num)
+        
+        return None
+
+    def convert_amount_to_numeric(self, amount_str):
+        """Convert any amount format to numeric value"""
+        if isinstance(amount_str, (int, float)):
+            return int(amount_str)
+            
+        import re
+        amount_str = str(amount_str).strip().lower()
+        
+        # Remove commas and spaces
+        amount_str = amount_str.replace(',', '').replace(' ', '')
+        
+        # Handle pure numeric values
+        if re.match(r'^\d+$', amount_str):
+            return int(amount_str)
+            
+        # Handle abbreviations (5L, 10Cr, 25K)
+        abbrev_map = {
+            'l': 100000,
+            'lac': 100000,
+            'lakh': 100000,
+            'cr': 10000000,
+            'crore': 10000000,
+            'k': 1000,
+            'thousand': 1000
+        }
+        
+        # Find the unit and multiplier
+        for unit, multiplier in abbrev_map.items():
+            if unit in amount_str:
+                num_part = amount_str.replace(unit, '')
+                if num_part:
+                    return int(float(num_part) * multiplier)
+                return multiplier
+        
+        # Handle word formats (5 lakh, 10 crore)
+        word_patterns = [
+            (r'(\d+\.?\d*)\s*(la[ck]h)', 100000),
+            (r'(\d+\.?\d*)\s*(crore)', 10000000),
+            (r'(\d+)\s*(thousand|k)', 1000)
+        ]
+        
+        for pattern, multiplier in word_patterns:
+            match = re.search(pattern, amount_str)
+            if match:
+                return int(float(match.group(1))) * multiplier
+                
+        return None
+    
+    def extract_numbers(self, text):
+        """Extract all numbers from text in any format"""
+        from query_parser import tokenize
+        return [tok.value for tok in tokenize(text) if tok.kind == 'amount']
+
+    def deduction_cap(self, code, income, age, year=None):
+        """Most that can be claimed under code, before any combined-limit pool"""
+        ded_info = self.rules('old', year).deductions[code]
+        
+        # Handle senior citizen limits
+        if 'senior_limit' in ded_info and age >= 60:
+            return ded_info['senior_limit']
+        
+        # Handle special calculations
+        if 'calc' in ded_info:
+            return CAP_FORMULAS[ded_info['calc']](income)
+        return ded_info['limit']
+    
+    def allowed_amount(self, code, amount, applied, income, age, year=None):
+        """Part of a claim under code that counts, given the deductions already applied"""
+        catalogue = self.rules('old', year).deductions
+        max_ded = self.deduction_cap(code, income, age, year)
+        
+        # Handle combined limits (like 80C+80CCC+80CCD(1))
+        combined_code = catalogue[code].get('combined_with')
+        if combined_code in applied:
+            remaining = catalogue[combined_code]['limit'] - applied[combined_code]
+            max_ded = min(max_ded, remaining)
+        return min(amount, max_ded)
+    
+    def calculate_tax(self, income, age, deductions, regime='new', year=None):
+        rules = self.rules(regime, year)
+        catalogue = rules.deductions
+        
+        # Apply standard deduction
+        taxable_income = income - rules.standard_deduction
+        applied_deductions = {'standard': rules.standard_deduction}
+        
+        if rules.regime == 'old':
+            # Process all other deductions
+            for ded_code, ded_amount in deductions.items():
+                if ded_code in catalogue:
+                    actual_ded = self.allowed_amount(ded_code, ded_amount, applied_deductions, income, age, year)
+                    taxable_income -= actual_ded
+                    applied_deductions[ded_code] = actual_ded
+        # New regime only has standard deduction
+        
+        # Slabs, rebate and cess
+        return rules.tax(taxable_income), taxable_income, applied_deductions
+
+    def compare_regimes(self, income, age, deductions, year=None):
+        """Calculate and compare both tax regimes"""
+        return self.comparison(self.calculate_tax(income, age, deductions, 'old', year),
+                               self.calculate_tax(income, age, deductions, 'new', year))
+    
+    def comparison(self, old, new):
+        """Comparison dict from the (tax, taxable, applied) results of both regimes"""
+        old_tax, old_taxable, old_deductions = old
+        new_tax, new_taxable, new_deductions = new
+        
+        savings = old_tax - new_tax
+        recommendation = ("OLD regime" if old_tax < new_tax 
+                         else "NEW regime" if new_tax < old_tax 
+                         else "BOTH regimes are equal")
+        
+        comparison = {
+            'old': {'tax': old_tax, 'taxable': old_taxable, 'deductions': old_deductions},
+            'new': {'tax': new_tax, 'taxable': new_taxable, 'deductions': new_deductions},
+            'savings': abs(savings),
+            'recommendation': recommendation,
+            'better_regime': 'old' if old_tax < new_tax else 'new'
+        }
+        return comparison
+
+    def calculate_tax_batch(self, incomes, ages, deductions_matrix=None, regime='new', codes=None, year=None):
+        """calculate_tax over whole columns of records at once (needs numpy)
+
+        Returns arrays of tax and taxable income plus a dict of applied
+        deduction columns, matching calculate_tax row for row.
+        """
+        from batch import calculate_tax_batch
+        return calculate_tax_batch(self, incomes, ages, deductions_matrix, regime, codes, year)
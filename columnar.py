@@ -0,0 +1,215 @@
+"""Compact columnar result store, memory-mapped for payroll-scale runs (needs numpy)
+
+    python columnar.py employees.csv results.taxcol [--chunk-size 100000]
+
+One comparison result is a handful of fixed-width numbers instead of a
+nested dict: income, age, both taxes, both taxable incomes, savings, the
+better regime (0 new, 1 old) and one column per deduction code holding the
+old-regime amount actually applied. A .taxcol file is a small JSON header
+followed by each column stored contiguously, so ResultStore.open() maps the
+file without reading it and every column is a zero-copy view:
+
+    store = ResultStore.open('results.taxcol')
+    seniors = store['age'] >= 60
+    store['savings'][seniors].sum()
+"""
+import argparse
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+from bulk import chunked, read_records
+from calculator import IndianTaxCalculator
+
+MAGIC = b'TAXCOL1\n'
+ALIGN = 64
+REGIMES = ('new', 'old')
+
+# Fixed columns; deduction columns follow, one per code, as float64
+BASE_COLUMNS = (
+    ('income', '<f8'),
+    ('age', '<i2'),
+    ('old_tax', '<f8'),
+    ('new_tax', '<f8'),
+    ('old_taxable', '<f8'),
+    ('new_taxable', '<f8'),
+    ('savings', '<f8'),
+    ('better_regime', '|u1'),
+)
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def compute_columns(calculator, incomes, ages, deductions, codes, year=None):
+    """Result columns for one chunk; deductions is {code: column}
+
+    Deductions are applied in catalogue order, as parsed queries apply them.
+    """
+    incomes = np.asarray(incomes, dtype=np.float64)
+    ordered = {code: deductions[code] for code in calculator.deductions if code in deductions}
+    old_tax, old_taxable, applied = calculator.calculate_tax_batch(incomes, ages, ordered, 'old', year=year)
+    new_tax, new_taxable, _ = calculator.calculate_tax_batch(incomes, ages, None, 'new', year=year)
+    zeros = np.zeros(incomes.shape[0])
+    columns = {
+        'income': incomes,
+        'age': np.broadcast_to(np.asarray(ages), incomes.shape),
+        'old_tax': old_tax,
+        'new_tax': new_tax,
+        'old_taxable': old_taxable,
+        'new_taxable': new_taxable,
+        'savings': np.abs(old_tax - new_tax),
+        'better_regime': old_tax < new_tax,
+    }
+    for code in codes:
+        columns[code] = applied.get(code, zeros)
+    return columns
+
+
+class ColumnarWriter:
+    """Append result columns chunk by chunk, then assemble one .taxcol file
+
+    Each column streams to its own spill file while rows arrive, so the row
+    count need not be known up front; close() writes the header and copies
+    the columns into place.
+    """
+
+    def __init__(self, path, codes=None, year=None):
+        self.path = path
+        self.codes = tuple(code for code in (codes or IndianTaxCalculator().deductions) if code != 'standard')
+        self.year = year
+        self.columns = BASE_COLUMNS + tuple((code, '<f8') for code in self.codes)
+        self.rows = 0
+        self._spill_dir = tempfile.mkdtemp(prefix='taxcol-', dir=os.path.dirname(os.path.abspath(path)))
+        self._spills = [open(os.path.join(self._spill_dir, str(i)), 'wb') for i in range(len(self.columns))]
+
+    def write(self, columns):
+        """Append a chunk given as {column name: array}"""
+        n = len(columns['income'])
+        for (name, dtype), spill in zip(self.columns, self._spills):
+            spill.write(np.ascontiguousarray(np.broadcast_to(columns[name], (n,)), dtype=dtype).tobytes())
+        self.rows += n
+
+    def close(self):
+        for spill in self._spills:
+            spill.close()
+        layout, offset = [], 0
+        for name, dtype in self.columns:
+            layout.append([name, dtype, offset])
+            offset = _aligned(offset + self.rows * np.dtype(dtype).itemsize)
+        header = json.dumps({'rows': self.rows, 'year': self.year, 'codes': list(self.codes),
+                             'regimes': list(REGIMES), 'columns': layout}).encode('utf-8')
+        data_start = _aligned(len(MAGIC) + 4 + len(header))
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as out:
+            out.write(MAGIC + struct.pack('<I', len(header)) + header)
+            for i, (name, dtype, column_offset) in enumerate(layout):
+                out.seek(data_start + column_offset)
+                with open(os.path.join(self._spill_dir, str(i)), 'rb') as spill:
+                    shutil.copyfileobj(spill, out, 1 << 20)
+            out.truncate(data_start + offset)
+        os.replace(tmp, self.path)
+        shutil.rmtree(self._spill_dir, ignore_errors=True)
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            for spill in self._spills:
+                spill.close()
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+
+class ResultStore:
+    """Read-only, memory-mapped view of a .taxcol file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a .taxcol result file")
+            (length,) = struct.unpack('<I', f.read(4))
+            self.header = json.loads(f.read(length))
+        self.path = path
+        self.rows = self.header['rows']
+        self.codes = tuple(self.header['codes'])
+        self.year = self.header['year']
+        data_start = _aligned(len(MAGIC) + 4 + length)
+        self._map = np.memmap(path, dtype=np.uint8, mode='r') if self.rows else None
+        self._columns = {}
+        for name, dtype, offset in self.header['columns']:
+            dtype = np.dtype(dtype)
+            start = data_start + offset
+            if self._map is None:
+                self._columns[name] = np.empty(0, dtype)
+            else:
+                self._columns[name] = self._map[start:start + self.rows * dtype.itemsize].view(dtype)
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    @property
+    def columns(self):
+        return tuple(self._columns)
+
+    def __getitem__(self, name):
+        """Zero-copy column array"""
+        return self._columns[name]
+
+    def __len__(self):
+        return self.rows
+
+    def record(self, i):
+        """One row as a dict, deduction columns under 'deductions'"""
+        row = {name: self._columns[name][i].item() for name, _ in BASE_COLUMNS}
+        row['better_regime'] = REGIMES[row['better_regime']]
+        row['deductions'] = {code: self._columns[code][i].item() for code in self.codes
+                             if self._columns[code][i]}
+        return row
+
+    def iter_chunks(self, size=1_000_000, columns=None):
+        """Yield {name: array view} for consecutive row ranges"""
+        names = columns or self.columns
+        for start in range(0, self.rows, size):
+            yield {name: self._columns[name][start:start + size] for name in names}
+
+
+def write_records(path, records, chunk_size=100000, codes=None, year=None, calculator=None):
+    """Compare both regimes for (employee_id, income, age, deductions) records into a .taxcol file"""
+    calculator = calculator or IndianTaxCalculator()
+    with ColumnarWriter(path, codes, year) as writer:
+        for chunk in chunked(records, chunk_size):
+            _, incomes, ages, deduction_rows = zip(*chunk)
+            present = set().union(*deduction_rows)
+            deductions = {code: [row.get(code, 0) for row in deduction_rows] for code in present}
+            writer.write(compute_columns(calculator, incomes, ages, deductions, writer.codes, year))
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute a payroll file into a memory-mappable .taxcol result file")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'))
+    parser.add_argument('--year', help="financial year, e.g. 2025-26")
+    args = parser.parse_args(argv)
+
+    calculator = IndianTaxCalculator()
+    records = read_records(args.input, args.input_format, calculator.deductions)
+    total = write_records(args.output, records, args.chunk_size, year=args.year, calculator=calculator)
+    print(f"Done: {total:,} rows written to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""Trie-based entity recognition for free-form tax queries
+
+A query is split into pieces: runs of letters and numbers (with digit
+grouping and decimals), so '80CCD(1B)', '80ccd 1b' and '80 CCD-1B' all
+read as 80 / ccd / 1 / b. Every vocabulary phrase (deduction codes and
+their synonyms, amount units, regime, command and intent words) is stored
+in a trie keyed by piece. The scanner takes the longest phrase starting at
+each piece, so 'home loan principal' wins over 'home loan' and '80CCD(1B)'
+over '80CCD(1)', and reads numbers with an optional unit as amounts.
+
+A word with no exact trie edge is corrected to the closest vocabulary word
+within a bounded edit distance (see max_edits) that continues a phrase,
+found through a symmetric-delete index built as phrases are added, so a
+correction costs a few dict lookups however large the vocabulary grows.
+Phrases added with fuzzy=False (commands, intent words) only match as
+written, so 'remote' is never read as 'remove'.
+
+Corrections and the trie node each word starts at are memoized per word
+across queries, so a word seen before costs one dict lookup; whole-query
+results are memoized as well.
+"""
+import re
+from collections import namedtuple
+
+from cache import LRUCache
+
+Token = namedtuple('Token', 'kind value start end')
+
+_PIECE_RE = re.compile(r'[a-z]+|\d+(?:,\d+)*(?:\.\d+)?', re.IGNORECASE)
+_LOWER_PIECE_RE = re.compile(r'[a-z]+|\d+(?:,\d+)*(?:\.\d+)?')
+# Characters allowed between the pieces of one phrase
+_JOINERS = frozenset(' \t\n-()/._\'')
+_SPACE = frozenset(' \t\n')
+_AGE_GAP = frozenset(' \t\n:=')
+_YEARS = frozenset(('year', 'years', 'yr', 'yrs'))
+_MAX_CORRECTIONS = 50000
+_UNSEEN = object()
+
+
+def max_edits(word):
+    """Typos tolerated in a word: none below 5 letters, 1 up to 8, then 2"""
+    n = len(word)
+    return 0 if n < 5 else 1 if n < 9 else 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, or limit + 1 once it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def _deletes(word, depth):
+    """word with every combination of up to depth letters removed"""
+    found = frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found = found | frontier
+    return found
+
+
+class Recognizer:
+    """Longest-match, typo-tolerant recognizer over a phrase vocabulary
+
+    vocabulary is an iterable of (phrase, kind, value) or (phrase, kind,
+    value, fuzzy) as taken by add. Kind 'unit' marks amount units (value is
+    the multiplier), only read right after a number; kind 'age' marks words
+    that introduce an age ('age 65'; value, when not None, holds the ages
+    the cue accepts). Every other phrase becomes a Token of its kind and
+    value.
+    """
+
+    def __init__(self, vocabulary=(), cache_size=4096):
+        self._trie = {}
+        self._words = set()
+        self._fuzzy = set()
+        self._deletes = {}
+        self._corrections = {}
+        self._starts = {}
+        self._units = {}
+        self._cache = LRUCache(cache_size)
+        for entry in vocabulary:
+            self.add(*entry)
+
+    def add(self, phrase, kind, value, fuzzy=True):
+        """Add one phrase; a phrase added twice keeps the later kind and value
+
+        With fuzzy=False no typo is corrected to the phrase's words, unless
+        some fuzzy phrase uses the same word.
+        """
+        pieces = [piece.lower() for piece in _PIECE_RE.findall(phrase)]
+        if not pieces:
+            raise ValueError(f"phrase {phrase!r} has no letters or digits")
+        node = self._trie
+        for piece in pieces:
+            node = node.setdefault(piece, {})
+            if piece.isalpha():
+                self._words.add(piece)
+                if fuzzy and piece not in self._fuzzy:
+                    self._fuzzy.add(piece)
+                    for form in _deletes(piece, max_edits(piece)):
+                        self._deletes.setdefault(form, set()).add(piece)
+        node[None] = (kind, value)
+        self._corrections = {}
+        self._starts = {}
+        self._units = {}
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget memoized query results; per-word memos only change with the vocabulary"""
+        self._cache.invalidate()
+
+    def __len__(self):
+        return len(self._words)
+
+    def corrections(self, word):
+        """Fuzzy vocabulary words within max_edits of word, closest first (word itself if known)"""
+        try:
+            return self._corrections[word]
+        except KeyError:
+            pass
+        found = (word,) if word in self._fuzzy else ()
+        limit = max_edits(word)
+        if limit:
+            candidates = set()
+            for form in _deletes(word, limit):
+                candidates.update(self._deletes.get(form, ()))
+            scored = []
+            for candidate in candidates:
+                bound = min(limit, max_edits(candidate))
+                distance = edit_distance(word, candidate, bound)
+                if distance <= bound:
+                    scored.append((distance, candidate))
+            found = tuple(candidate for _, candidate in sorted(scored))
+        if len(self._corrections) >= _MAX_CORRECTIONS:
+            self._corrections = {}
+        self._corrections[word] = found
+        return found
+
+    def correct(self, word):
+        """Closest vocabulary word to word (alphabetical among equals), or None"""
+        found = self.corrections(word)
+        return found[0] if found else None
+
+    def _child(self, node, word):
+        """Trie edge for word, else for its closest correction that continues a phrase here"""
+        child = node.get(word)
+        if child is None and word.isalpha():
+            for fixed in self.corrections(word):
+                child = node.get(fixed)
+                if child is not None:
+                    break
+        return child
+
+    def _start(self, word):
+        """Trie node word leads to from the root (after correction), or None, memoized"""
+        node = self._starts.get(word, _UNSEEN)
+        if node is _UNSEEN:
+            node = self._child(self._trie, word)
+            if len(self._starts) >= _MAX_CORRECTIONS:
+                self._starts = {}
+            self._starts[word] = node
+        return node
+
+    def _longest(self, text, pieces, i, node):
+        """(next piece index, (kind, value)) of the longest phrase at piece i, or None
+
+        node is the trie node piece i leads to from the root.
+        """
+        end = pieces[i][1]
+        entry = node.get(None)
+        best = None if entry is None else (i + 1, entry)
+        for j in range(i + 1, len(pieces)):
+            start, stop, word = pieces[j]
+            if not _JOINERS.issuperset(text[end:start]):
+                break
+            node = self._child(node, word)
+            if node is None:
+                break
+            end = stop
+            entry = node.get(None)
+            if entry is not None:
+                best = (j + 1, entry)
+        return best
+
+    def _unit(self, text, pieces, i, end):
+        """Multiplier of the unit at piece i when only spaces separate it from end, else None"""
+        if i >= len(pieces) or not _SPACE.issuperset(text[end:pieces[i][0]]):
+            return None
+        word = pieces[i][2]
+        try:
+            return self._units[word]
+        except KeyError:
+            if len(self._units) >= _MAX_CORRECTIONS:
+                self._units = {}
+            node = self._start(word)
+            entry = node and node.get(None)
+            multiplier = self._units[word] = entry[1] if entry and entry[0] == 'unit' else None
+            return multiplier
+
+    def _age(self, text, pieces, i, start, end, ages=None):
+        """Age token for a cue ending at end, followed by 'is'/'of' and up to 3 digits
+
+        A number with a unit ('i was 15 lakh') is an amount, not an age, and
+        so is one outside ages, the cue's value, when it has one.
+        """
+        if i < len(pieces) and pieces[i][2] in ('is', 'of') and _SPACE.issuperset(text[end:pieces[i][0]]):
+            end = pieces[i][1]
+            i += 1
+        if i < len(pieces):
+            number_start, number_end, word = pieces[i]
+            if (word.isdigit() and len(word) <= 3 and _AGE_GAP.issuperset(text[end:number_start])
+                    and (ages is None or int(word) in ages)
+                    and not text[number_end:number_end + 1].isalnum()
+                    and self._unit(text, pieces, i + 1, number_end) is None):
+                return Token('age', int(word), start, number_end), i + 1
+        return None, i
+
+    def _amount(self, text, pieces, i):
+        """Amount (or 'NN years', 'NN years old' age) token for the number at piece i"""
+        start, end, word = pieces[i]
+        n = len(pieces)
+        if (word.isdigit() and len(word) <= 3 and i + 1 < n and pieces[i + 1][2] in _YEARS
+                and _JOINERS.issuperset(text[end:pieces[i + 1][0]])):
+            end, i = pieces[i + 1][1], i + 2
+            gap = text[end:pieces[i][0]] if i < n else ''
+            if gap and _JOINERS.issuperset(gap) and pieces[i][2] == 'old':
+                end, i = pieces[i][1], i + 1
+            return Token('age', int(word), start, end), i
+        number = float(word.replace(',', ''))
+        multiplier = self._unit(text, pieces, i + 1, end)
+        if multiplier is not None:
+            return Token('amount', round(number * multiplier), start, pieces[i + 1][1]), i + 2
+        return Token('amount', int(number), start, end), i + 1
+
+    def _scan(self, text):
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            text = lowered
+            pieces = [(m.start(), m.end(), m.group()) for m in _LOWER_PIECE_RE.finditer(text)]
+        else:  # A character lowered to two ('İ'); keep offsets into text
+            pieces = [(m.start(), m.end(), m.group().lower()) for m in _PIECE_RE.finditer(text)]
+        tokens = []
+        starts = self._starts
+        i, n = 0, len(pieces)
+        while i < n:
+            start, end, word = pieces[i]
+            node = starts.get(word, _UNSEEN)
+            if node is _UNSEEN:
+                node = self._start(word)
+            match = None if node is None else self._longest(text, pieces, i, node)
+            if match is not None:
+                j, (kind, value) = match
+                if kind == 'age':
+                    token, j = self._age(text, pieces, j, start, pieces[j - 1][1], value)
+                    if token is not None:
+                        tokens.append(token)
+                    i = j
+                    continue
+                if kind != 'unit':
+                    end = pieces[j - 1][1]
+                    if text[end:end + 1] == ')':  # close '80CCD(1B)'
+                        end += 1
+                    tokens.append(Token(kind, value, start, end))
+                    i = j
+                    continue
+            if word[0].isdigit():
+                token, i = self._amount(text, pieces, i)
+                tokens.append(token)
+            else:
+                i += 1
+        return tuple(tokens)
+
+    def recognize(self, text):
+        """Tokens for text in order of appearance, memoized per distinct query"""
+        tokens = self._cache.get(text)
+        if tokens is None:
+            tokens = self._scan(text)
+            self._cache.put(text, tokens)
+        return tokens
+
+    def cache_stats(self):
+        return {**self._cache.stats(), 'corrections': len(self._corrections)}
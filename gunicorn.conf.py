@@ -0,0 +1,20 @@
+import os
+
+bind = os.environ.get('TAX_BIND', '0.0.0.0:8000')
+
+# /calculate sessions live in each worker's memory and gunicorn hands
+# connections to whichever worker accepts first, so one worker by default
+# keeps every follow-up on its session; threads overlap network I/O. Raise
+# TAX_WORKERS only when serving the stateless /api/*. To scale /calculate,
+# run several instances behind a load balancer routing on the tax_session
+# cookie.
+workers = int(os.environ.get('TAX_WORKERS', 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('TAX_THREADS', 4))
+
+# Import the app (and compile the slab tables) once in the master; forked
+# workers share it copy-on-write.
+preload_app = True
+
+timeout = 30
+keepalive = 5
@@ -0,0 +1,257 @@
+"""Per-stage timing histograms, counters and a slow-request profiler
+
+    metrics = Metrics()
+    with metrics.timer('parse'):
+        ...
+    metrics.incr('missing_income')
+    metrics.snapshot()        # plain dict, for /metrics or tests
+    metrics.prometheus()      # Prometheus text exposition format
+
+SlowRequestProfiler is opt-in: while a watched request runs, one background
+thread samples its Python stack every few milliseconds, and requests that
+end up slower than the threshold get their samples written out as collapsed
+stacks (one "frame;frame;frame count" line each, the input flamegraph.pl
+and speedscope read).
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+# Bucket upper bounds in seconds: 1us doubling up to ~8.4s, then +Inf
+BUCKETS = tuple(1e-6 * 2 ** i for i in range(24)) + (float('inf'),)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th observation"""
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return 0.0
+        rank, seen = pct / 100 * count, 0
+        for bound, n in zip(self.bounds, counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        with self._lock:
+            counts, count, total, peak = list(self.counts), self.count, self.sum, self.max
+        return {
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else 0.0,
+            'max': peak,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'buckets': [(bound, n) for bound, n in zip(self.bounds, counts) if n],
+        }
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metrics:
+    """Named stage histograms and counters, safe to share between threads"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def timer(self, stage):
+        """Context manager recording the time spent inside it under stage"""
+        return _Timer(self.histogram(stage))
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = Counter()
+
+    def snapshot(self):
+        with self._lock:
+            histograms, counters = dict(self.histograms), dict(self.counters)
+        return {
+            'stages': {stage: h.snapshot() for stage, h in histograms.items()},
+            'counters': counters,
+        }
+
+    def prometheus(self, prefix='tax', extra_counters=None):
+        """Snapshot in Prometheus text format; extra_counters is {(name, labels): value}"""
+        lines = []
+        snap = self.snapshot()
+        name = f'{prefix}_stage_seconds'
+        lines.append(f'# TYPE {name} histogram')
+        for stage, h in sorted(snap['stages'].items()):
+            cumulative = 0
+            by_bound = dict(h['buckets'])
+            for bound in BUCKETS:
+                cumulative += by_bound.get(bound, 0)
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h["sum"]!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h["count"]}')
+        counters = {(counter, ''): value for counter, value in snap['counters'].items()}
+        counters.update(extra_counters or {})
+        typed = set()
+        for (counter, labels), value in sorted(counters.items()):
+            if counter not in typed:
+                typed.add(counter)
+                lines.append(f'# TYPE {prefix}_{counter}_total counter')
+            lines.append(f'{prefix}_{counter}_total{labels} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class SlowRequestProfiler:
+    """Sample the stacks of watched requests and dump the slow ones
+
+    threshold is in seconds, interval is the sampling period. Dumps go to
+    directory as slow-<epoch ms>-<duration ms>-<pid>-<n>.txt, where n counts
+    this profiler's dumps. The sampler thread starts with the first watched
+    request and sleeps on a condition while nothing is watched.
+    """
+
+    def __init__(self, threshold=0.1, directory='profiles', interval=0.002):
+        self.threshold = threshold
+        self.directory = directory
+        self.interval = interval
+        self.dumps = 0
+        self._active = {}
+        self._lock = threading.Lock()
+        self._watching = threading.Condition(self._lock)
+        self._thread = None
+
+    def watch(self, label=''):
+        return _Watch(self, label)
+
+    def _start(self, ident):
+        samples = Counter()
+        with self._watching:
+            self._active[ident] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name='slow-request-sampler', daemon=True)
+                self._thread.start()
+            self._watching.notify()
+        return samples
+
+    def _stop(self, ident):
+        with self._lock:
+            self._active.pop(ident, None)
+
+    def _sample(self):
+        while True:
+            with self._watching:
+                while not self._active:
+                    self._watching.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                idents = list(self._active)
+            frames = sys._current_frames()
+            stacks = []
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                if stack:
+                    stacks.append((ident, ';'.join(reversed(stack))))
+            with self._lock:
+                # A request stopped since the snapshot keeps the samples it had
+                for ident, stack in stacks:
+                    samples = self._active.get(ident)
+                    if samples is not None:
+                        samples[stack] += 1
+
+    def _dump(self, label, elapsed, samples):
+        with self._lock:
+            samples = samples.most_common()
+            self.dumps += 1
+            number = self.dumps
+        os.makedirs(self.directory, exist_ok=True)
+        name = f'slow-{int(time.time() * 1000)}-{elapsed * 1000:.0f}-{os.getpid()}-{number}.txt'
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'# {elapsed * 1000:.1f} ms, {sum(count for _, count in samples)} samples every '
+                    f'{self.interval * 1000:g} ms: {label!r}\n')
+            for stack, count in samples:
+                f.write(f'{stack} {count}\n')
+        return path
+
+
+class _Watch:
+    __slots__ = ('profiler', 'label', 'ident', 'samples', 'start')
+
+    def __init__(self, profiler, label):
+        self.profiler = profiler
+        self.label = label
+
+    def __enter__(self):
+        self.ident = threading.get_ident()
+        self.samples = self.profiler._start(self.ident)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.profiler._stop(self.ident)
+        if elapsed >= self.profiler.threshold:
+            self.profiler._dump(self.label, elapsed, self.samples)
+
+
+def profiler_from_env(environ=os.environ):
+    """SlowRequestProfiler configured by TAX_PROFILE_SLOW_MS / TAX_PROFILE_DIR, or None"""
+    threshold = environ.get('TAX_PROFILE_SLOW_MS')
+    if not threshold:
+        return None
+    return SlowRequestProfiler(float(threshold) / 1000, environ.get('TAX_PROFILE_DIR', 'profiles'))
@@ -0,0 +1,124 @@
+"""Tax-minimizing split of an investable amount across deduction sections
+
+Every rupee claimed under any section lowers old-regime taxable income by
+one rupee, so the saving depends only on how much lands inside the caps, not
+on which section takes it. The optimum is therefore: place as much as the
+caps allow, but never more than it takes to bring taxable income down to
+the point where no tax is owed, since rupees past that point save nothing.
+Sections are filled in the order given; caps follow deduction_cap (senior
+limits, income-based calcs) and the combined 80C pool.
+"""
+from calculator import IndianTaxCalculator
+
+# Sections people choose to put money into; capped ones first, open-ended last
+INVESTABLE_SECTIONS = ('80C', '80CCC', '80CCD(1)', '80CCD(1B)', '80D', '24(b)',
+                       '80EEA', '80EEB', '80E', '80G')
+
+
+def _pool_heads(catalogue):
+    """{code: pool head} for every code sharing a combined limit"""
+    heads = {}
+    for code, info in catalogue.items():
+        if 'combined_with' in info:
+            heads[code] = heads[info['combined_with']] = info['combined_with']
+    return heads
+
+
+def optimize_deductions(income, age, budget, sections=INVESTABLE_SECTIONS, claimed=None, year=None, calculator=None):
+    """Best old-regime allocation of budget on top of already claimed deductions
+
+    Returns a dict with the allocation per section, the tax before and after,
+    the total saving, each section's share of that saving and the marginal
+    saving of one more rupee per section (0 once a section is full).
+    """
+    calculator = calculator or IndianTaxCalculator()
+    claimed = claimed or {}
+    tax_before, taxable, applied = calculator.calculate_tax(income, age, claimed, 'old', year)
+    rules = calculator.rules('old', year)
+    heads = _pool_heads(rules.deductions)
+    pool_used = {}
+    for code, amount in applied.items():
+        if code in heads:
+            pool_used[heads[code]] = pool_used.get(heads[code], 0) + amount
+
+    to_place = max(0, min(budget, taxable - rules.taxable_for_tax(0)))
+    allocation, section_saving, room_left = {}, {}, {}
+    current = taxable
+    for code in sections:
+        room = calculator.deduction_cap(code, income, age, year) - applied.get(code, 0)
+        head = heads.get(code)
+        if head:
+            room = min(room, rules.deductions[head]['limit'] - pool_used.get(head, 0))
+        amount = max(0, min(room, to_place))
+        room_left[code] = room - amount
+        if amount:
+            allocation[code] = amount
+            section_saving[code] = rules.tax(current) - rules.tax(current - amount)
+            current -= amount
+            to_place -= amount
+            if head:
+                pool_used[head] = pool_used.get(head, 0) + amount
+
+    next_rupee = rules.tax(current) - rules.tax(current - 1)
+    marginal = {code: next_rupee if room_left[code] > 0 else 0 for code in sections}
+
+    merged = {code: claimed.get(code, 0) + allocation.get(code, 0)
+              for code in rules.deductions if code in claimed or code in allocation}
+    tax_after = calculator.calculate_tax(income, age, merged, 'old', year)[0]
+    return {
+        'allocation': allocation,
+        'invested': sum(allocation.values()),
+        'tax_before': tax_before,
+        'tax_after': tax_after,
+        'saving': tax_before - tax_after,
+        'section_saving': section_saving,
+        'marginal_saving_per_rupee': marginal,
+    }
+
+
+def optimize_batch(incomes, ages, budgets, sections=INVESTABLE_SECTIONS, year=None, calculator=None):
+    """optimize_deductions over whole payroll columns (needs numpy)
+
+    Starts from the standard deduction alone. Returns arrays keyed like the
+    scalar result, with allocation and marginal_saving_per_rupee as dicts of
+    columns.
+    """
+    import numpy as np
+    from batch import deduction_cap, rules_tax
+
+    calculator = calculator or IndianTaxCalculator()
+    incomes = np.asarray(incomes, dtype=np.float64)
+    n = incomes.shape[0]
+    ages = np.broadcast_to(np.asarray(ages), (n,))
+    budgets = np.broadcast_to(np.asarray(budgets, dtype=np.float64), (n,))
+    rules = calculator.rules('old', year)
+    heads = _pool_heads(rules.deductions)
+
+    taxable = incomes - rules.standard_deduction
+    to_place = np.maximum(0, np.minimum(budgets, taxable - rules.taxable_for_tax(0)))
+    pool_used = {head: np.zeros(n) for head in set(heads.values())}
+    allocation, has_room = {}, {}
+    for code in sections:
+        room = deduction_cap(calculator, code, incomes, ages, year)
+        head = heads.get(code)
+        if head:
+            room = np.minimum(room, rules.deductions[head]['limit'] - pool_used[head])
+        amount = np.maximum(0, np.minimum(room, to_place))
+        has_room[code] = room - amount > 0
+        allocation[code] = amount
+        to_place = to_place - amount
+        if head:
+            pool_used[head] = pool_used[head] + amount
+
+    invested = sum(allocation.values(), np.zeros(n))
+    tax_before = rules_tax(taxable, rules)
+    tax_after = rules_tax(taxable - invested, rules)
+    next_rupee = tax_after - rules_tax(taxable - invested - 1, rules)
+    return {
+        'allocation': allocation,
+        'invested': invested,
+        'tax_before': tax_before,
+        'tax_after': tax_after,
+        'saving': tax_before - tax_after,
+        'marginal_saving_per_rupee': {code: np.where(has_room[code], next_rupee, 0.0) for code in sections},
+    }
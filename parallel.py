@@ -0,0 +1,64 @@
+"""Process-pool regime comparison for large payroll batches
+
+Records are (income, age, deductions) tuples. Each worker builds its own
+IndianTaxCalculator once in the pool initializer, so tasks ship only the
+records themselves; results come back in input order.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from bulk import chunked
+from calculator import IndianTaxCalculator
+from rules import DEFAULT_FY
+
+_calculator = None
+
+
+def _init_worker(year=None):
+    global _calculator
+    _calculator = IndianTaxCalculator(year or DEFAULT_FY)
+
+
+def _summary(comparison):
+    return (comparison['old']['tax'], comparison['new']['tax'],
+            comparison['old']['taxable'], comparison['new']['taxable'],
+            comparison['better_regime'])
+
+
+def _compare_chunk(chunk, full=False):
+    compare = _calculator.compare_regimes
+    catalogue = _calculator.deductions
+    results = []
+    for income, age, deductions in chunk:
+        # Catalogue order, the order bulk and the API apply deductions in
+        ordered = {code: deductions[code] for code in catalogue if code in deductions}
+        comparison = compare(income, age, ordered)
+        results.append(comparison if full else _summary(comparison))
+    return results
+
+
+def compare_parallel(records, workers=None, chunk_size=5000, full=False, year=None):
+    """Compare both regimes for every record, yielding results in input order
+
+    By default each result is a compact (old_tax, new_tax, old_taxable,
+    new_taxable, better_regime) tuple; full=True yields the whole
+    compare_regimes dict. Only workers * 2 chunks are in flight at once, so
+    records may be a lazy iterable of any length. workers=1 runs in-process.
+    year selects the financial year's rules (default DEFAULT_FY).
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(year)
+        for chunk in chunked(records, chunk_size):
+            yield from _compare_chunk(chunk, full)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(year,)) as pool:
+        pending = deque()
+        for chunk in chunked(records, chunk_size):
+            pending.append(pool.submit(_compare_chunk, chunk, full))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,255 @@
+import re
+from collections import namedtuple
+
+from entities import Recognizer, Token
+
+# Deduction codes recognised in queries; 'standard' is always applied, never parsed
+DEDUCTION_CODES = (
+    '80C', '80CCC', '80CCD(1)', '80CCD(1B)', '80CCH', '80D', '80DD', '80DDB',
+    '80E', '80EE', '80EEA', '80EEB', '80G', '80GG', '80GGA', '80TTA', '80TTB',
+    '80U', '24(b)', '80RRB', '80QQB'
+)
+
+# Phrases that stand for a deduction code
+DEDUCTION_ALIASES = {
+    'lic': '80C', 'lic premium': '80C', 'life insurance': '80C', 'life insurance premium': '80C',
+    'ppf': '80C', 'public provident fund': '80C', 'pf': '80C', 'epf': '80C', 'provident fund': '80C',
+    'elss': '80C', 'tax saving fd': '80C', 'tax saver fd': '80C', 'nsc': '80C', 'ulip': '80C',
+    'sukanya samriddhi': '80C', 'ssy': '80C', 'tuition fees': '80C', 'home loan principal': '80C',
+    'pension fund': '80CCC', 'pension plan': '80CCC', 'annuity plan': '80CCC',
+    'nps': '80CCD(1)', 'national pension system': '80CCD(1)', 'nps contribution': '80CCD(1)',
+    'additional nps': '80CCD(1B)', 'extra nps': '80CCD(1B)',
+    'agniveer': '80CCH', 'agniveer corpus': '80CCH',
+    'health insurance': '80D', 'mediclaim': '80D', 'medical insurance': '80D',
+    'health insurance premium': '80D', 'preventive health checkup': '80D',
+    'disabled dependent': '80DD', 'dependent disability': '80DD',
+    'medical treatment': '80DDB', 'specified disease': '80DDB',
+    'education loan': '80E', 'education loan interest': '80E', 'student loan': '80E',
+    'first home loan': '80EE', 'first time home loan': '80EE',
+    'affordable housing': '80EEA', 'affordable housing loan': '80EEA',
+    'electric vehicle loan': '80EEB', 'ev loan': '80EEB',
+    'donation': '80G', 'donations': '80G', 'charity': '80G', 'charitable donation': '80G',
+    'rent': '80GG', 'rent paid': '80GG', 'house rent': '80GG',
+    'scientific research donation': '80GGA',
+    'savings interest': '80TTA', 'savings account interest': '80TTA', 'savings bank interest': '80TTA',
+    'senior citizen interest': '80TTB', 'deposit interest': '80TTB',
+    'self disability': '80U', 'disability': '80U',
+    'home loan': '24(b)', 'housing loan': '24(b)', 'home loan interest': '24(b)', 'housing loan interest': '24(b)',
+    'patent royalty': '80RRB', 'patent royalties': '80RRB',
+    'author royalty': '80QQB', 'book royalty': '80QQB',
+}
+
+UNIT_MULTIPLIERS = {
+    'l': 100000, 'lac': 100000, 'lacs': 100000, 'lakh': 100000, 'lakhs': 100000, 'lpa': 100000,
+    'cr': 10000000, 'crore': 10000000, 'crores': 10000000,
+    'k': 1000, 'thousand': 1000, 'thousands': 1000,
+    'mn': 1000000, 'million': 1000000,
+}
+
+# Ages a sentence like "i'm 62" may state; 'my 80C was 150' is no age
+PLAUSIBLE_AGES = range(18, 101)
+
+# Intent words: (kind, value) per phrase. 'income' marks the amount that is
+# the income, 'remove' drops the codes right after it from a session. Age
+# cues that are also everyday words only take an age in PLAUSIBLE_AGES.
+# They are matched exactly, never as typo corrections ('remote' is not 'remove')
+INTENT_PHRASES = {
+    'show deductions': ('command', 'show_deductions'),
+    'show all deductions': ('command', 'show_deductions'),
+    'list deductions': ('command', 'show_deductions'),
+    'list all deductions': ('command', 'show_deductions'),
+    'list of deductions': ('command', 'show_deductions'),
+    'available deductions': ('command', 'show_deductions'),
+    'all available deductions': ('command', 'show_deductions'),
+    'reset': ('command', 'reset'), 'start over': ('command', 'reset'),
+    'start again': ('command', 'reset'), 'clear all': ('command', 'reset'),
+    'remove': ('remove', None), 'drop': ('remove', None), 'delete': ('remove', None),
+    'without': ('remove', None), 'exclude': ('remove', None), 'excluding': ('remove', None),
+    'no': ('remove', None),
+    'income': ('income', None), 'annual income': ('income', None), 'gross income': ('income', None),
+    'salary': ('income', None), 'ctc': ('income', None), 'package': ('income', None),
+    'earn': ('income', None), 'earns': ('income', None), 'earning': ('income', None),
+    'earnings': ('income', None),
+    'age': ('age', None), 'aged': ('age', None), 'ages': ('age', None),
+    'i am': ('age', PLAUSIBLE_AGES), "i'm": ('age', PLAUSIBLE_AGES), 'i was': ('age', PLAUSIBLE_AGES),
+    'i were': ('age', PLAUSIBLE_AGES), 'turned': ('age', PLAUSIBLE_AGES), 'turning': ('age', PLAUSIBLE_AGES),
+}
+
+# income is the amount taken as the income; free_amounts are the amounts no
+# deduction claimed; bare_codes the codes mentioned without an amount;
+# remove the codes a remove word applies to ('remove 80D', 'no 80C or 80D');
+# income_cue whether an income word ('salary 12L') named the income
+ParsedQuery = namedtuple('ParsedQuery',
+                         'amounts deductions age regime command free_amounts bare_codes income remove income_cue')
+
+
+def _vocabulary():
+    for code in DEDUCTION_CODES:
+        for prefix in ('', 'section ', 'sec ', 'u/s '):
+            yield prefix + code, 'deduction', code
+    for phrase, code in DEDUCTION_ALIASES.items():
+        yield phrase, 'deduction', code
+    for unit, multiplier in UNIT_MULTIPLIERS.items():
+        yield unit, 'unit', multiplier
+    for name in ('old', 'new'):
+        for phrase in ('regime', 'tax regime', 'scheme', 'tax scheme'):
+            yield f'{name} {phrase}', 'regime', name
+    for phrase, (kind, value) in INTENT_PHRASES.items():
+        yield phrase, kind, value, False
+
+
+# Shared recognizer over the vocabulary above; add synonyms with RECOGNIZER.add()
+RECOGNIZER = Recognizer(_vocabulary())
+
+# Filler allowed between a deduction code and the amount it claims
+_CONNECTOR_RE = re.compile(r"""
+    (?:\s|[:=\-]|₹|\brs\b\.?|\binr\b|\b(?:in|under|for|towards|as|of|u/s|section|sec|deductions?
+       |claim(?:ed)?|invested|investments?|is|amount|worth|paid|premiums?|contributions?)\b)*
+""", re.IGNORECASE | re.VERBOSE)
+
+
+# Filler allowed between a remove word and its code, and between listed codes
+_REMOVE_GAP_RE = re.compile(r"(?:\s|\b(?:the|my|all|deductions?|claims?)\b)*", re.IGNORECASE)
+_LIST_GAP_RE = re.compile(r"(?:\s|[,&]|\b(?:and|or|the|my)\b)*", re.IGNORECASE)
+
+
+def tokenize(text):
+    """Typed tokens for a query: amounts, deductions, ages, regimes, commands and intents"""
+    return list(RECOGNIZER.recognize(text))
+
+
+# Whether a gap is connector filler, memoized since most gaps are ' ', ', ' or ' in '
+_CONNECTOR_GAPS = {}
+_MAX_CONNECTOR_GAPS = 10000
+
+
+def _adjacent(text, left, right):
+    gap = text[left.end:right.start]
+    try:
+        return _CONNECTOR_GAPS[gap]
+    except KeyError:
+        if len(_CONNECTOR_GAPS) >= _MAX_CONNECTOR_GAPS:
+            _CONNECTOR_GAPS.clear()
+        adjacent = _CONNECTOR_GAPS[gap] = _CONNECTOR_RE.fullmatch(gap) is not None
+        return adjacent
+
+
+def _amount_after(text, tokens, i, reserved=None):
+    """Whether the token after the code at i is an amount written next to it"""
+    return (i + 1 < len(tokens) and tokens[i + 1].kind == 'amount' and i + 1 != reserved
+            and _adjacent(text, tokens[i], tokens[i + 1]))
+
+
+def _bind_deductions(text, tokens, reserved=None):
+    """Pair each deduction code with the amount written next to it
+
+    Both '80C 1.5L' and '1.5L in 80C' are accepted. A code prefers the amount
+    after it, unless that amount is itself followed by another code that
+    has no amount after it and so needs it ('2L 80C 50K 80D'); in
+    '12L 80C 1.5L 80D 25K' every code keeps the amount after it. The token
+    at index reserved (the income) is never taken. Returns the deductions
+    and the indices of the tokens that were bound, codes and amounts alike.
+    """
+    deductions = {}
+    bound = set() if reserved is None else {reserved}
+    for i, tok in enumerate(tokens):
+        if tok.kind != 'deduction':
+            continue
+        prev_i, next_i = i - 1, i + 1
+        before = (prev_i >= 0 and prev_i not in bound and tokens[prev_i].kind == 'amount'
+                  and _adjacent(text, tokens[prev_i], tok))
+        after = _amount_after(text, tokens, i, reserved)
+        if after and before:
+            follower = next_i + 1
+            if (follower < len(tokens) and tokens[follower].kind == 'deduction'
+                    and _adjacent(text, tokens[next_i], tokens[follower])
+                    and not _amount_after(text, tokens, follower, reserved)):
+                after = False
+        if after:
+            chosen = next_i
+        elif before:
+            chosen = prev_i
+        else:
+            continue
+        bound.add(chosen)
+        bound.add(i)
+        deductions[tok.value] = deductions.get(tok.value, 0) + tokens[chosen].value
+    bound.discard(reserved)
+    return deductions, bound
+
+
+def _removals(text, tokens, bound):
+    """Unclaimed codes right after a remove word, or listed after such a code"""
+    codes, previous = [], None
+    for i, tok in enumerate(tokens):
+        if tok.kind == 'remove':
+            previous = tok
+            continue
+        if tok.kind == 'deduction' and i not in bound and previous is not None:
+            gap = _REMOVE_GAP_RE if previous.kind == 'remove' else _LIST_GAP_RE
+            if gap.fullmatch(text, previous.end, tok.start) is not None:
+                if tok.value not in codes:
+                    codes.append(tok.value)
+                previous = tok
+                continue
+        previous = None
+    return tuple(codes)
+
+
+def _income(text, tokens):
+    """Index of the amount written next to an income word ('income of 15L', '12L salary'), or None"""
+    for i, tok in enumerate(tokens):
+        if tok.kind != 'income':
+            continue
+        after, before = i + 1, i - 1
+        if after < len(tokens) and tokens[after].kind == 'amount' and _adjacent(text, tok, tokens[after]):
+            return after
+        if before >= 0 and tokens[before].kind == 'amount' and _adjacent(text, tokens[before], tok):
+            return before
+    return None
+
+
+def parse_query(text):
+    """Parse a free-form tax query into its amounts, deductions, age, regime and command
+
+    The income is the amount next to an income word, which no deduction
+    may claim, else the largest amount not claimed by a deduction, else the
+    largest amount.
+    """
+    tokens = RECOGNIZER.recognize(text)
+    kinds = {tok.kind for tok in tokens}
+    amounts = [tok.value for tok in tokens if tok.kind == 'amount']
+    age = regime = command = None
+    # Each pass below only runs for queries with tokens it looks at
+    if not kinds.isdisjoint(('age', 'regime', 'command')):
+        for tok in tokens:
+            if tok.kind == 'age' and age is None:
+                age = tok.value
+            elif tok.kind == 'regime' and regime is None:
+                regime = tok.value
+            elif tok.kind == 'command' and command != 'show_deductions':
+                command = tok.value
+    cue = _income(text, tokens) if 'income' in kinds else None
+    if 'deduction' not in kinds:
+        deductions, bound, free_amounts, bare_codes, remove = {}, (), list(amounts), [], ()
+    else:
+        deductions, bound = _bind_deductions(text, tokens, cue)
+        if len(deductions) > 1:
+            # Catalogue order, so the same deductions written in any order parse identically
+            deductions = {code: deductions[code] for code in DEDUCTION_CODES if code in deductions}
+        free_amounts, bare_codes = [], []
+        for i, tok in enumerate(tokens):
+            if i not in bound:
+                if tok.kind == 'amount':
+                    free_amounts.append(tok.value)
+                elif tok.kind == 'deduction' and tok.value not in deductions:
+                    bare_codes.append(tok.value)
+        remove = _removals(text, tokens, bound) if 'remove' in kinds else ()
+    if cue is not None:
+        income = tokens[cue].value
+    elif free_amounts or amounts:
+        income = max(free_amounts or amounts)
+    else:
+        income = None
+    return ParsedQuery(amounts, deductions, age, regime, command, free_amounts, bare_codes, income, remove,
+                       cue is not None)
@@ -0,0 +1,272 @@
+"""Report rendering for chatbot answers in text, markdown or HTML
+
+Each format is a table of str.format-style templates, one per report
+piece, bound once at import. Reports are produced piece by piece:
+render_*() joins the pieces once, write_*() sends them straight to any
+object with a write() method, so a large export never builds one big
+string. Pieces that never change (the deductions catalogue, slab
+descriptions, notes) are rendered once per format and year and then
+reused.
+
+Comparison reports have the sections summary, old, new, recommendation,
+note and advice; single-regime reports have summary, deductions and
+advice. Pass sections to render only some of them; a report skips names
+that belong to the other kind, and unknown names raise ValueError. The
+default text format reproduces the chatbot's original output exactly.
+"""
+import html
+from collections import namedtuple
+
+FORMATS = ('text', 'markdown', 'html')
+COMPARISON_SECTIONS = ('summary', 'old', 'new', 'recommendation', 'note', 'advice')
+REGIME_SECTIONS = ('summary', 'deductions', 'advice')
+SECTIONS = tuple(dict.fromkeys(COMPARISON_SECTIONS + REGIME_SECTIONS))
+
+_RULE = "=" * 60
+
+_TEMPLATES = {
+    'text': {
+        'compare_summary': "📊 Analysis for Income: ₹{income:,}{senior}\n🏦 **Tax Regime Comparison**\n" + _RULE + "\n",
+        'senior': " (Senior Citizen)",
+        'regime_block': "🔸 {name} Regime:\n- Taxable Income: ₹{taxable:,}\n- Tax Liability: ₹{tax:,.2f}\n",
+        'deductions_head': "\n🔹 Applied Deductions:\n",
+        'deduction': "- {code}: ₹{amount:,} ({desc})\n",
+        'deductions_tail': "",
+        'slabs': "- Slabs: {slabs}\n\n",
+        'recommendation': "💡 **Recommendation**:\n- {recommendation} is better\n",
+        'savings': "- Potential savings: ₹{savings:,.2f}\n",
+        'note': ("\nℹ️ Note:\n"
+                 "- Old regime requires investment proofs for deductions\n"
+                 "- New regime has higher basic exemption but fewer deductions\n" + _RULE + "\n"),
+        'regime_summary': "Under {name} regime:\n- Taxable Income: ₹{taxable:,}\n- Estimated Tax: ₹{tax:,.2f}\n",
+        'advice': ("\n🔍 For more accuracy, please provide:\n"
+                   "- Exact investment amounts under each section\n"
+                   "- Any other income sources or deductions\n"),
+        'catalogue_head': "📋 All Available Deductions:\n" + _RULE + "\n",
+        'catalogue_row': "🔹 {code} (Max: {limit}): {desc}\n",
+        'catalogue_tail': ("\n💡 Tip: Include deduction codes with amounts in your query\n"
+                           "Example: '15L income with 1.5L 80C and 50K 80D'\n" + _RULE),
+    },
+    'markdown': {
+        'compare_summary': "## Tax regime comparison for income ₹{income:,}{senior}\n\n",
+        'senior': " (senior citizen)",
+        'regime_block': "### {name} regime\n\n- Taxable income: ₹{taxable:,}\n- Tax liability: ₹{tax:,.2f}\n",
+        'deductions_head': "\n| Section | Applied | Description |\n|---|---:|---|\n",
+        'deduction': "| {code} | ₹{amount:,} | {desc} |\n",
+        'deductions_tail': "",
+        'slabs': "\nSlabs: {slabs}\n\n",
+        'recommendation': "### Recommendation\n\n**{recommendation}** is better\n",
+        'savings': "\nPotential savings: **₹{savings:,.2f}**\n",
+        'note': ("\n> Old regime requires investment proofs for deductions.\n"
+                 "> New regime has higher basic exemption but fewer deductions.\n"),
+        'regime_summary': "## {name} regime\n\n- Taxable income: ₹{taxable:,}\n- Estimated tax: ₹{tax:,.2f}\n",
+        'advice': ("\nFor more accuracy, provide exact investment amounts under each section "
+                   "and any other income sources or deductions.\n"),
+        'catalogue_head': "## Available deductions\n\n| Section | Max | Description |\n|---|---:|---|\n",
+        'catalogue_row': "| {code} | {limit} | {desc} |\n",
+        'catalogue_tail': "\nInclude deduction codes with amounts in your query, e.g. `15L income with 1.5L 80C and 50K 80D`.\n",
+    },
+    'html': {
+        'compare_summary': '<h2>Tax regime comparison for income ₹{income:,}{senior}</h2>\n',
+        'senior': ' (senior citizen)',
+        'regime_block': ('<h3>{name} regime</h3>\n<dl><dt>Taxable income</dt><dd>₹{taxable:,}</dd>'
+                         '<dt>Tax liability</dt><dd>₹{tax:,.2f}</dd></dl>\n'),
+        'deductions_head': '<table class="deductions">\n<tr><th>Section</th><th>Applied</th><th>Description</th></tr>\n',
+        'deduction': '<tr><td>{code}</td><td>₹{amount:,}</td><td>{desc}</td></tr>\n',
+        'deductions_tail': '</table>\n',
+        'slabs': '<p class="slabs">Slabs: {slabs}</p>\n',
+        'recommendation': '<p class="recommendation"><strong>{recommendation}</strong> is better</p>\n',
+        'savings': '<p class="savings">Potential savings: ₹{savings:,.2f}</p>\n',
+        'note': ('<ul class="note"><li>Old regime requires investment proofs for deductions</li>'
+                 '<li>New regime has higher basic exemption but fewer deductions</li></ul>\n'),
+        'regime_summary': ('<h2>{name} regime</h2>\n<dl><dt>Taxable income</dt><dd>₹{taxable:,}</dd>'
+                           '<dt>Estimated tax</dt><dd>₹{tax:,.2f}</dd></dl>\n'),
+        'advice': ('<p class="advice">For more accuracy, please provide exact investment amounts under '
+                   'each section and any other income sources or deductions.</p>\n'),
+        'catalogue_head': ('<h2>Available deductions</h2>\n<table class="catalogue">\n'
+                           '<tr><th>Section</th><th>Max</th><th>Description</th></tr>\n'),
+        'catalogue_row': '<tr><td>{code}</td><td>{limit}</td><td>{desc}</td></tr>\n',
+        'catalogue_tail': '</table>\n',
+    },
+}
+
+_ESCAPES = {
+    'text': str,
+    'markdown': lambda value: str(value).replace('|', r'\|'),
+    'html': lambda value: html.escape(str(value)),
+}
+
+_NAMES = {'text': {'old': 'OLD', 'new': 'NEW'}, 'markdown': {'old': 'Old', 'new': 'New'},
+          'html': {'old': 'Old', 'new': 'New'}}
+
+
+def _bind(template):
+    """The template's bound format method, or the template itself if it has no fields"""
+    return template.format if '{' in template else template
+
+
+_Format = namedtuple('_Format', 'pieces escape names')
+_COMPILED = {
+    fmt: _Format({name: _bind(template) for name, template in pieces.items()}, _ESCAPES[fmt], _NAMES[fmt])
+    for fmt, pieces in _TEMPLATES.items()
+}
+
+
+def parse_sections(text):
+    """Section names from a comma-separated form field, or None for all of them"""
+    names = [name.strip() for name in (text or '').split(',') if name.strip()]
+    return names or None
+
+
+def _lakhs(amount):
+    return f"{round(amount / 100000, 2):g}"
+
+
+def describe_slabs(slab_table):
+    """Compact slab summary such as '0-2.5L(0%), 2.5-5L(5%), 5-10L(20%), 10L+(30%)'"""
+    parts = []
+    for low, high, rate in slab_table.slabs:
+        if high == float('inf'):
+            parts.append(f"{_lakhs(low)}L+({rate:g}%)")
+        else:
+            parts.append(f"{_lakhs(low)}-{_lakhs(high)}L({rate:g}%)")
+    return ', '.join(parts)
+
+
+class _Joiner:
+    """Collects written pieces for render_*()"""
+    __slots__ = ('parts', 'write')
+
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
+
+    def value(self):
+        return ''.join(self.parts)
+
+
+class Renderer:
+    """Renders comparison, single-regime and catalogue reports"""
+
+    def __init__(self, calculator):
+        self.calculator = calculator
+        self._static = {}
+
+    def _format(self, fmt):
+        try:
+            return _COMPILED[fmt]
+        except KeyError:
+            raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}") from None
+
+    def _sections(self, sections, default):
+        if sections is None:
+            return default
+        for name in sections:
+            if name not in SECTIONS:
+                raise ValueError(f"Unknown section {name!r}; choose from {', '.join(SECTIONS)}")
+        return sections
+
+    def check(self, fmt='text', sections=None):
+        """Raise ValueError for an unknown format or section, before doing any work
+
+        Sections of either report kind pass, since which kind a query gets
+        is only known once it is answered.
+        """
+        self._format(fmt)
+        self._sections(sections, None)
+
+    def _slabs(self, regime, year):
+        key = ('slabs', regime, year)
+        text = self._static.get(key)
+        if text is None:
+            text = self._static[key] = describe_slabs(self.calculator.rules(regime, year).slab_table)
+        return text
+
+    def _write_deductions(self, out, spec, deductions):
+        pieces, escape = spec.pieces, spec.escape
+        catalogue = self.calculator.deductions
+        out.write(pieces['deductions_head'])
+        for code, amount in deductions.items():
+            desc = catalogue.get(code, {}).get('desc', code)
+            out.write(pieces['deduction'](code=escape(code), amount=amount, desc=escape(desc)))
+        out.write(pieces['deductions_tail'])
+
+    def write_comparison(self, out, income, age, comparison, fmt='text', sections=None, year=None):
+        """Write a compare_regimes report to out"""
+        spec = self._format(fmt)
+        pieces = spec.pieces
+        sections = self._sections(sections, COMPARISON_SECTIONS)
+        if 'summary' in sections:
+            out.write(pieces['compare_summary'](income=income, senior=pieces['senior'] if age >= 60 else ''))
+        for regime in ('old', 'new'):
+            if regime in sections:
+                details = comparison[regime]
+                out.write(pieces['regime_block'](name=spec.names[regime], taxable=details['taxable'],
+                                                 tax=details['tax']))
+                self._write_deductions(out, spec, details['deductions'])
+                out.write(pieces['slabs'](slabs=spec.escape(self._slabs(regime, year))))
+        if 'recommendation' in sections:
+            out.write(pieces['recommendation'](recommendation=spec.escape(comparison['recommendation'])))
+            if comparison['savings'] > 0:
+                out.write(pieces['savings'](savings=comparison['savings']))
+        if 'note' in sections:
+            out.write(pieces['note'])
+        if 'advice' in sections:
+            out.write(pieces['advice'])
+
+    def write_regime(self, out, regime, result, fmt='text', sections=None):
+        """Write a single-regime calculate_tax report to out"""
+        spec = self._format(fmt)
+        pieces = spec.pieces
+        sections = self._sections(sections, REGIME_SECTIONS)
+        if 'summary' in sections:
+            out.write(pieces['regime_summary'](name=spec.names[regime], taxable=result['taxable'],
+                                               tax=result['tax']))
+        if 'deductions' in sections:
+            self._write_deductions(out, spec, result['deductions'])
+        if 'advice' in sections:
+            out.write(pieces['advice'])
+
+    def write_answer(self, out, regime, income, age, result, fmt='text', sections=None, year=None):
+        """Write the report for a 'compare', 'old' or 'new' result"""
+        if regime == 'compare':
+            self.write_comparison(out, income, age, result, fmt, sections, year)
+        else:
+            self.write_regime(out, regime, result, fmt, sections)
+
+    def write_many(self, out, answers, fmt='text', sections=None, separator='\n'):
+        """Stream reports for an iterable of (regime, income, age, result), e.g. a batch export"""
+        for i, (regime, income, age, result) in enumerate(answers):
+            if i and separator:
+                out.write(separator)
+            self.write_answer(out, regime, income, age, result, fmt, sections)
+
+    def catalogue(self, fmt='text', year=None):
+        """The deductions catalogue, rendered once per format and year"""
+        key = ('catalogue', fmt, year)
+        text = self._static.get(key)
+        if text is None:
+            spec = self._format(fmt)
+            pieces, escape = spec.pieces, spec.escape
+            parts = [pieces['catalogue_head']]
+            for code, info in self.calculator.rules('old', year).deductions.items():
+                limit = f"₹{info['limit']:,}" if isinstance(info['limit'], int) else info['limit']
+                parts.append(pieces['catalogue_row'](code=escape(code), limit=escape(limit), desc=escape(info['desc'])))
+            parts.append(pieces['catalogue_tail'])
+            text = self._static[key] = ''.join(parts)
+        return text
+
+    def render_comparison(self, income, age, comparison, fmt='text', sections=None, year=None):
+        out = _Joiner()
+        self.write_comparison(out, income, age, comparison, fmt, sections, year)
+        return out.value()
+
+    def render_regime(self, regime, result, fmt='text', sections=None):
+        out = _Joiner()
+        self.write_regime(out, regime, result, fmt, sections)
+        return out.value()
+
+    def render_answer(self, regime, income, age, result, fmt='text', sections=None, year=None):
+        out = _Joiner()
+        self.write_answer(out, regime, income, age, result, fmt, sections, year)
+        return out.value()
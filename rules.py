@@ -0,0 +1,191 @@
+"""Tax rules per financial year, expressed as data
+
+RULE_DATA is compiled once at import into an immutable registry indexed by
+(financial year, regime). Every piece is a tuple, namedtuple, SlabTable or
+FrozenDict, so rule sets pickle cheaply into pool workers and cannot be
+changed by accident.
+
+FY 2024-25 keeps the figures this calculator has always used. FY 2025-26
+adds the Budget 2025 new-regime slabs, the higher new-regime standard
+deduction and the section 87A rebate (without marginal relief).
+"""
+from collections import namedtuple
+
+from slabs import SlabTable
+
+DEFAULT_FY = '2024-25'
+
+
+def _nps_employee(income):
+    return min(0.1*income, 150000)
+
+
+def _rent_paid(income):
+    return min(5000*12, 0.25*income, income-0.1*income)
+
+
+# Income-based caps, referenced by name from the deduction tables
+CAP_FORMULAS = {
+    'nps_employee': _nps_employee,
+    'rent_paid': _rent_paid,
+}
+
+_INF = float('inf')
+
+DEDUCTIONS = {
+    '80C': {'limit': 150000, 'desc': "Investments (PF, PPF, LIC, etc.)"},
+    '80CCC': {'limit': 150000, 'combined_with': '80C', 'desc': "Pension funds"},
+    '80CCD(1)': {'limit': 150000, 'combined_with': '80C', 'calc': 'nps_employee', 'desc': "NPS contributions"},
+    '80CCD(1B)': {'limit': 50000, 'desc': "Additional NPS"},
+    '80CCH': {'limit': _INF, 'desc': "Agniveer Corpus Fund"},
+    '80D': {'limit': 25000, 'senior_limit': 50000, 'desc': "Health insurance"},
+    '80DD': {'limit': 75000, 'severe_limit': 125000, 'desc': "Disabled dependent"},
+    '80DDB': {'limit': 40000, 'senior_limit': 100000, 'desc': "Medical treatment"},
+    '80E': {'limit': _INF, 'desc': "Education loan interest"},
+    '80EE': {'limit': 50000, 'desc': "First-time home loan"},
+    '80EEA': {'limit': 150000, 'desc': "Affordable housing loan"},
+    '80EEB': {'limit': 150000, 'desc': "Electric vehicle loan"},
+    '80G': {'limit': _INF, 'desc': "Charitable donations"},
+    '80GG': {'limit': 60000, 'calc': 'rent_paid', 'desc': "Rent paid"},
+    '80GGA': {'limit': _INF, 'desc': "Scientific research donations"},
+    '80TTA': {'limit': 10000, 'desc': "Savings account interest"},
+    '80TTB': {'limit': 50000, 'desc': "Senior citizen interest income"},
+    '80U': {'limit': 75000, 'severe_limit': 125000, 'desc': "Self-disability"},
+    '24(b)': {'limit': 200000, 'desc': "Home loan interest"},
+    '80RRB': {'limit': 300000, 'desc': "Patent royalties"},
+    '80QQB': {'limit': 300000, 'desc': "Author royalties"},
+    'standard': {'limit': 50000, 'desc': "Standard deduction"}
+}
+
+OLD_SLABS = (
+    (0, 250000, 0),
+    (250001, 500000, 5),
+    (500001, 1000000, 20),
+    (1000001, _INF, 30)
+)
+
+# Per year: cess rate, and per regime the slabs, standard deduction and
+# 87A rebate as (taxable income ceiling, maximum rebate) or None
+RULE_DATA = {
+    '2024-25': {
+        'cess': 0.04,
+        'deductions': DEDUCTIONS,
+        'old': {'slabs': OLD_SLABS, 'standard': 50000, 'rebate': None},
+        'new': {
+            'slabs': (
+                (0, 300000, 0),
+                (300001, 600000, 5),
+                (600001, 900000, 10),
+                (900001, 1200000, 15),
+                (1200001, 1500000, 20),
+                (1500001, _INF, 30)
+            ),
+            'standard': 50000,
+            'rebate': None,
+        },
+    },
+    '2025-26': {
+        'cess': 0.04,
+        'deductions': DEDUCTIONS,
+        'old': {'slabs': OLD_SLABS, 'standard': 50000, 'rebate': (500000, 12500)},
+        'new': {
+            'slabs': (
+                (0, 400000, 0),
+                (400001, 800000, 5),
+                (800001, 1200000, 10),
+                (1200001, 1600000, 15),
+                (1600001, 2000000, 20),
+                (2000001, 2400000, 25),
+                (2400001, _INF, 30)
+            ),
+            'standard': 75000,
+            'rebate': (1200000, 60000),
+        },
+    },
+}
+
+
+class FrozenDict(dict):
+    """Read-only dict that still pickles"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("rule tables are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class RuleSet(namedtuple('RuleSet', 'fy regime slab_table cess standard_deduction rebate deductions')):
+    """Compiled rules for one (financial year, regime)"""
+    __slots__ = ()
+
+    def tax(self, taxable_income):
+        """Final tax on taxable_income: slabs, 87A rebate, then cess"""
+        tax = self.slab_table.tax(taxable_income)
+        if self.rebate and taxable_income <= self.rebate[0]:
+            tax -= min(tax, self.rebate[1])
+        tax += tax * self.cess
+        return max(0, tax)
+
+    def tax_segments(self):
+        """(start, end, tax at start, rate) pieces of tax before cess, rebate included"""
+        pieces = self.slab_table.segments()
+        if not self.rebate:
+            return pieces
+        ceiling, rebate = self.rebate
+        out = []
+        for start, end, tax, rate in pieces:
+            if start < ceiling:
+                # Below the ceiling the rebate wipes out up to `rebate` of tax
+                split = min(end, ceiling)
+                zero_until = start if tax >= rebate else (start + (rebate - tax) / rate if rate else split)
+                zero_until = min(max(zero_until, start), split)
+                if zero_until > start:
+                    out.append((start, zero_until, 0.0, 0.0))
+                if split > zero_until:
+                    out.append((zero_until, split, tax + (zero_until - start) * rate - rebate, rate))
+                start, tax = split, tax + (split - start) * rate
+            if end > start:
+                out.append((start, end, tax, rate))
+        return out
+
+    def taxable_for_tax(self, target):
+        """Highest taxable income whose final tax does not exceed target"""
+        limit = target / (1 + self.cess)
+        best = self.slab_table.lows[0]
+        for start, end, tax, rate in self.tax_segments():
+            if tax > limit:
+                break
+            best = end if rate == 0 else min(end, start + (limit - tax) / rate)
+        return best
+
+
+def _freeze(deductions):
+    return FrozenDict({code: FrozenDict(info) for code, info in deductions.items()})
+
+
+def _compile(data):
+    registry = {}
+    for fy, year in data.items():
+        deductions = _freeze(year['deductions'])
+        for regime in ('old', 'new'):
+            spec = year[regime]
+            registry[(fy, regime)] = RuleSet(fy, regime, SlabTable(spec['slabs']), year['cess'],
+                                             spec['standard'], spec['rebate'], deductions)
+    return FrozenDict(registry)
+
+
+REGISTRY = _compile(RULE_DATA)
+FINANCIAL_YEARS = tuple(sorted(RULE_DATA))
+
+
+def get_rules(fy=None, regime='new'):
+    """RuleSet for (fy, regime); fy defaults to DEFAULT_FY"""
+    try:
+        return REGISTRY[(fy or DEFAULT_FY, regime.lower())]
+    except KeyError:
+        raise ValueError(f"No tax rules for FY {fy} ({regime} regime); "
+                         f"known years: {', '.join(FINANCIAL_YEARS)}") from None
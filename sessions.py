@@ -0,0 +1,189 @@
+"""Per-session what-if state for conversational follow-ups
+
+A session remembers the profile built up over earlier turns (income, age,
+claimed deductions, regime, year) together with the intermediate results
+for both regimes. A follow-up such as "now add 50K 80D" or "what if I
+were 62" only redoes the parts it touches: the new regime depends on
+income alone, and in the old regime only the changed claims, the
+senior-citizen caps and the members of an affected combined pool are
+re-capped before taxable income is re-totalled. Results are identical to a
+full calculate_tax; benchmarks.check_sessions replays random turns to check.
+
+SessionStore keeps sessions in LRU order under a count and a memory cap,
+and drops those idle for longer than idle_timeout.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Result for one regime; bracket is the slab index taxable income falls in
+RegimeState = namedtuple('RegimeState', 'tax taxable deductions bracket')
+
+
+class SessionState:
+    """Profile and intermediate results after the latest turn of one session"""
+    __slots__ = ('income', 'age', 'deductions', 'regime', 'year', 'old', 'new', 'pool_remaining')
+
+    def __init__(self, income=None, age=30, deductions=None, regime='compare', year=None,
+                 old=None, new=None, pool_remaining=None):
+        self.income = income
+        self.age = age
+        self.deductions = deductions or {}
+        self.regime = regime
+        self.year = year
+        self.old = old
+        self.new = new
+        self.pool_remaining = pool_remaining or {}
+
+    def result(self, regime, calculator):
+        """Structured result in the shape TaxChatbot.calculate returns"""
+        if regime == 'compare':
+            return calculator.comparison(self.old[:3], self.new[:3])
+        state = self.old if regime == 'old' else self.new
+        return {'tax': state.tax, 'taxable': state.taxable, 'deductions': state.deductions}
+
+    def updated(self, calculator, income=None, age=None, deductions=None, regime=None, year=None):
+        """New state with the given fields changed, recomputing only what they affect
+
+        Returns (state, incremental) where incremental is False when
+        everything had to be recomputed (first result, new income or year).
+        """
+        income = self.income if income is None else income
+        age = self.age if age is None else age
+        deductions = self.deductions if deductions is None else dict(deductions)
+        regime = regime or self.regime
+        year = self.year if year is None else year
+        state = SessionState(income, age, deductions, regime, year)
+        if income is None:
+            return state, False
+
+        old_rules = calculator.rules('old', year)
+        incremental = self.old is not None and income == self.income and year == self.year
+        if incremental:
+            state.new = self.new
+            dirty = {code for code in set(deductions).union(self.deductions)
+                     if deductions.get(code) != self.deductions.get(code)}
+            if (age >= 60) != (self.age >= 60):
+                dirty.update(code for code in deductions if 'senior_limit' in old_rules.deductions.get(code, ()))
+            previous = self.old.deductions
+        else:
+            new_rules = calculator.rules('new', year)
+            new_tax, new_taxable, new_applied = calculator.calculate_tax(income, age, {}, 'new', year)
+            state.new = RegimeState(new_tax, new_taxable, new_applied, new_rules.slab_table.bracket(new_taxable))
+            dirty, previous = set(deductions), {}
+
+        # Same order and arithmetic as calculate_tax, so the totals match it exactly
+        catalogue = old_rules.deductions
+        applied = {'standard': old_rules.standard_deduction}
+        changed = {code for code in dirty if code not in deductions}
+        taxable = income - old_rules.standard_deduction
+        for code, amount in deductions.items():
+            if code not in catalogue:
+                continue
+            head = catalogue[code].get('combined_with')
+            if code in dirty or head in changed:
+                allowed = calculator.allowed_amount(code, amount, applied, income, age, year)
+                if allowed != previous.get(code):
+                    changed.add(code)
+            else:
+                allowed = previous[code]
+            applied[code] = allowed
+            taxable -= allowed
+        state.old = RegimeState(old_rules.tax(taxable), taxable, applied, old_rules.slab_table.bracket(taxable))
+        state.pool_remaining = {head: catalogue[head]['limit'] - applied.get(head, 0)
+                                for head in {info['combined_with'] for info in catalogue.values()
+                                             if 'combined_with' in info}}
+        return state, incremental
+
+
+def _sizeof(state):
+    """Rough resident size of a SessionState in bytes"""
+    size = sys.getsizeof(state)
+    for value in (state.deductions, state.pool_remaining, state.old, state.new):
+        size += sys.getsizeof(value)
+        if isinstance(value, RegimeState):
+            size += sys.getsizeof(value.deductions)
+    return size
+
+
+class SessionStore:
+    """Thread-safe LRU store of SessionState capped by count and total bytes
+
+    Sessions idle for more than idle_timeout seconds are dropped as the
+    store is touched. Counts evictions (pushed out by either cap) and
+    expirations (idle sessions dropped) for monitoring. The store lives in
+    process memory, so each worker process has its own sessions.
+    """
+
+    def __init__(self, max_sessions=10000, max_bytes=32 * 1024 * 1024, idle_timeout=1800, clock=time.monotonic):
+        if max_sessions <= 0 or max_bytes <= 0:
+            raise ValueError("max_sessions and max_bytes must be positive")
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = self.expirations = 0
+
+    def _expire(self, now):
+        if self.idle_timeout is None:
+            return
+        # Least recently seen first, so stop at the first live session
+        while self._data:
+            session_id, (_, size, seen) = next(iter(self._data.items()))
+            if now - seen <= self.idle_timeout:
+                return
+            del self._data[session_id]
+            self._bytes -= size
+            self.expirations += 1
+
+    def get(self, session_id):
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            state, size, _ = entry
+            self._data[session_id] = (state, size, now)
+            self._data.move_to_end(session_id)
+            return state
+
+    def put(self, session_id, state):
+        now = self._clock()
+        size = _sizeof(state)
+        with self._lock:
+            self._expire(now)
+            old = self._data.pop(session_id, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[session_id] = (state, size, now)
+            self._bytes += size
+            while len(self._data) > 1 and (len(self._data) > self.max_sessions or self._bytes > self.max_bytes):
+                _, (_, evicted, _) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def discard(self, session_id):
+        with self._lock:
+            entry = self._data.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._data),
+                'bytes': self._bytes,
+                'max_sessions': self.max_sessions,
+                'max_bytes': self.max_bytes,
+                'idle_timeout': self.idle_timeout,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -0,0 +1,61 @@
+from bisect import bisect_left
+
+class SlabTable:
+    """Compiled, immutable slab brackets with the tax owed below each one
+
+    tax() finds the bracket with one bisect and adds the partial bracket to
+    the precomputed cumulative tax, giving the same result as walking the
+    slabs one by one.
+    """
+    __slots__ = ('slabs', 'lows', 'highs', 'fractions', 'cumulative')
+
+    def __init__(self, slabs):
+        slabs = tuple(tuple(slab) for slab in slabs)
+        cumulative = []
+        total = 0
+        for low, high, rate in slabs:
+            cumulative.append(total)
+            total += (high - low) * (rate / 100)
+        set_attr = object.__setattr__
+        set_attr(self, 'slabs', slabs)
+        set_attr(self, 'lows', tuple(slab[0] for slab in slabs))
+        set_attr(self, 'highs', tuple(slab[1] for slab in slabs))
+        set_attr(self, 'fractions', tuple(slab[2] / 100 for slab in slabs))
+        set_attr(self, 'cumulative', tuple(cumulative))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SlabTable is immutable")
+
+    def __reduce__(self):
+        return SlabTable, (self.slabs,)
+
+    def __eq__(self, other):
+        return isinstance(other, SlabTable) and self.slabs == other.slabs
+
+    def __hash__(self):
+        return hash(self.slabs)
+
+    def __repr__(self):
+        return f"SlabTable({self.slabs!r})"
+
+    def bracket(self, taxable_income):
+        """Index of the slab taxable_income falls in, -1 below the first"""
+        return bisect_left(self.lows, taxable_income) - 1
+
+    def tax(self, taxable_income):
+        """Tax before cess on taxable_income"""
+        i = bisect_left(self.lows, taxable_income) - 1
+        if i < 0:
+            return 0
+        return self.cumulative[i] + (min(taxable_income, self.highs[i]) - self.lows[i]) * self.fractions[i]
+
+    def segments(self):
+        """(start, end, tax at start, rate) pieces of tax before cess, gaps included"""
+        pieces = []
+        for i, (low, high, fraction) in enumerate(zip(self.lows, self.highs, self.fractions)):
+            pieces.append((low, high, self.cumulative[i], fraction))
+            if i + 1 < len(self.lows) and self.lows[i + 1] > high:
+                # The rupee between one slab's top and the next slab's start is untaxed
+                pieces.append((high, self.lows[i + 1], self.cumulative[i + 1], 0.0))
+        return pieces
+
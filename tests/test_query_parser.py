@@ -0,0 +1,65 @@
+import unittest
+
+from query_parser import parse_query
+
+
+class BindDeductionsTest(unittest.TestCase):
+    def assertParses(self, query, income, deductions):
+        parsed = parse_query(query)
+        self.assertEqual((parsed.income, parsed.deductions), (income, deductions), query)
+
+    def test_income_first_then_codes_with_amounts_after(self):
+        self.assertParses('income 15L 80C 1.5L 80D 20K', 1500000, {'80C': 150000, '80D': 20000})
+        self.assertParses('12L 80C 1.5L 80D 25K', 1200000, {'80C': 150000, '80D': 25000})
+        self.assertParses('income 1200000 80C 150000 80CCD(1B) 50000', 1200000,
+                          {'80C': 150000, '80CCD(1B)': 50000})
+        self.assertParses('12L 80C 1.5L 80D 25K 80E 40K', 1200000,
+                          {'80C': 150000, '80D': 25000, '80E': 40000})
+
+    def test_single_code_takes_amount_after_it(self):
+        self.assertParses('12L 80C 1.5L', 1200000, {'80C': 150000})
+        self.assertParses('salary 15L 80C 1.5L', 1500000, {'80C': 150000})
+
+    def test_amounts_before_codes(self):
+        self.assertParses('2L 80C 50K 80D income 12L', 1200000, {'80C': 200000, '80D': 50000})
+        self.assertParses('15L income with 2L 80C and 50K 80D', 1500000, {'80C': 200000, '80D': 50000})
+
+    def test_codes_then_income_last(self):
+        self.assertParses('80C 1.5L 80D 25K 12L', 1200000, {'80C': 150000, '80D': 25000})
+        self.assertParses('I earn 12L, 80C 1.5L, 80D 25K, 80E 40K', 1200000,
+                          {'80C': 150000, '80D': 25000, '80E': 40000})
+
+    def test_income_word_amount_is_never_claimed(self):
+        self.assertParses('income 15L 80C', 1500000, {})
+        self.assertParses('salary 12L 80D and 80C 1.5L', 1200000, {'80C': 150000})
+        self.assertParses('80C 1.5L, 80D 25K, salary 20L', 2000000, {'80C': 150000, '80D': 25000})
+
+
+class IntentTest(unittest.TestCase):
+    def test_intent_words_are_not_typo_corrected(self):
+        parsed = parse_query('I work remote, income 15L')
+        self.assertEqual((parsed.remove, parsed.income), ((), 1500000))
+        self.assertIsNone(parse_query('resett').command)
+
+    def test_remove_applies_to_the_codes_after_it(self):
+        self.assertEqual(parse_query('no').remove, ())
+        self.assertEqual(parse_query('remove 80D').remove, ('80D',))
+        self.assertEqual(parse_query('drop 80C and 80D').remove, ('80C', '80D'))
+        self.assertEqual(parse_query('no, I earn 15L with 80D 25K').remove, ())
+
+
+class AgeTest(unittest.TestCase):
+    def test_sentence_cues_take_plausible_ages_only(self):
+        self.assertEqual(parse_query('what if I were 62').age, 62)
+        self.assertEqual(parse_query("I'm 65 with 12L").age, 65)
+        parsed = parse_query('I earn 12L; my 80C investment was 150')
+        self.assertEqual((parsed.age, parsed.income), (None, 1200000))
+        self.assertIsNone(parse_query("I'm 150").age)
+
+    def test_age_word_and_years_old(self):
+        self.assertEqual(parse_query('age 61 income 10L').age, 61)
+        self.assertEqual(parse_query('50 years old 12L').age, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
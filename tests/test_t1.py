@@ -0,0 +1,26 @@
+import unittest
+
+from t1 import TaxChatbot
+
+
+class SessionIncomeTest(unittest.TestCase):
+    def setUp(self):
+        self.chatbot = TaxChatbot()
+
+    def incomes(self, *turns):
+        return [self.chatbot.session_answer('s', query).income for query in turns]
+
+    def test_amount_meant_for_a_code_keeps_the_income(self):
+        self.assertEqual(self.incomes('I earn 12L', 'I invested 1.5L more in 80C'), [1200000, 1200000])
+        self.assertEqual(self.incomes('my 80C investment was 150'), [1200000])
+
+    def test_income_word_or_new_full_query_replaces_it(self):
+        self.assertEqual(self.incomes('I earn 12L', 'salary 20L, 80D', 'what about 15L', '18L with 80C 1.5L'),
+                         [1200000, 2000000, 1500000, 1800000])
+
+    def test_small_bare_number_does_not_replace_it(self):
+        self.assertEqual(self.incomes('income 12L', '500'), [1200000, 1200000])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,12 @@
+"""Production WSGI entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The shared TaxChatbot is safe under worker threads. Follow-up sessions are
+kept in each worker process's memory, so gunicorn.conf.py runs one worker
+by default; /api/* is stateless and scales over any number of workers
+(TAX_WORKERS).
+"""
+from app import create_app
+
+app = create_app()